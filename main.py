@@ -6,6 +6,9 @@ Real OCR processing, translation, and image manipulation
 
 import easyocr
 import os
+import gzip
+import hashlib
+import itertools
 import ollama
 from PIL import Image, ImageDraw, ImageFont
 import webbrowser
@@ -15,12 +18,64 @@ import numpy as np
 import textwrap
 import json
 import tempfile
+from pathlib import Path
 import cv2
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, Response, request, jsonify, send_file
+from jinja2 import Environment, DictLoader
 import threading
 import time
 
+# Brotli is optional; gzip from the standard library is always available
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    from rjsmin import jsmin
+    from rcssmin import cssmin
+    MINIFIERS_AVAILABLE = True
+except ImportError:
+    MINIFIERS_AVAILABLE = False
+
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+class UploadRequest(Request):
+    """Request that spools uploaded files straight into a named temp file"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # The multipart parser writes the upload here once, and OCR reads it in
+        # place instead of copying it again with FileStorage.save()
+        suffix = os.path.splitext(filename or '')[1]
+        return tempfile.NamedTemporaryFile('wb+', suffix=suffix, delete=False)
+
 app = Flask(__name__)
+app.request_class = UploadRequest
+
+def json_error(message, status):
+    """Build a JSON error response directly, skipping jsonify's provider lookup"""
+    return Response(json.dumps({'error': message}), status=status, mimetype='application/json')
+
+@app.teardown_request
+def remove_spooled_uploads(exc=None):
+    """Delete spooled upload files that did not become the current image"""
+    # Only look at files the request actually parsed, so JSON bodies are not re-parsed
+    files = request.__dict__.get('files')
+    if not files:
+        return
+    for _, file in files.items(multi=True):
+        path = getattr(file.stream, 'name', None)
+        file.stream.close()
+        if path and path != current_image_path and os.path.exists(path):
+            os.remove(path)
+
+# Pre-serialized body for the most common fixed error
+NO_DOCUMENT_ERROR_BODY = json.dumps({'error': 'No processed document available'})
 
 # Global variables to store processing data
 current_image = None
@@ -28,6 +83,23 @@ current_bboxes = []
 current_translated_text = []
 current_image_path = None
 current_target_language = 'te'
+# Region actions as last sent by the client, which only posts changes against a version
+current_user_actions = {}
+current_actions_version = 0
+# Guards the version check and update of current_user_actions across server threads
+actions_lock = threading.Lock()
+# Actions a region can take in the processed document
+REGION_ACTIONS = ('preserve', 'translate', 'whiteout')
+
+# Ollama model list cache (listing models is a round trip to the Ollama service)
+MODEL_LIST_TTL = 30
+model_list_cache = {'models': None, 'expires': 0.0}
+model_list_lock = threading.Lock()
+
+# Text regions translated per Ollama call; one region per call pays the model round trip every time
+TRANSLATION_BATCH_SIZE = 10
+# Below this many characters in total, the longer JSON batch prompt costs more than it saves
+TRANSLATION_BATCH_MIN_CHARS = 200
 
 def process_image_with_ocr(image_path):
     """Process image with EasyOCR and return bounding boxes and text"""
@@ -136,6 +208,46 @@ Provide complete translation in {lang_info['name']}:"""
         print("Using fallback translation method...")
         return fallback_translation(text, target_language)
 
+def translate_batch(texts, model='gemma3-legal-samanantar-pro:latest', target_language='te', agent_mode=False):
+    """Translate several text regions with a single Ollama call, falling back to one call per region"""
+    translate_one = translate_text_with_agents if agent_mode else translate_text
+    # Agent mode keeps its legal-translator prompt, so each region gets its own call
+    if agent_mode or len(texts) < 2 or sum(map(len, texts)) < TRANSLATION_BATCH_MIN_CHARS:
+        return [translate_one(text, model, target_language) for text in texts]
+    
+    lang_info = get_language_info(target_language)
+    segments = '\n'.join(f"[{i}] {text}" for i, text in enumerate(texts, 1))
+    
+    if target_language == 'en':
+        task = "Improve each numbered segment of this government document for better clarity and formal tone while maintaining all legal meaning."
+    else:
+        task = f"Translate each numbered segment of this government document to {lang_info['name']} ({lang_info['native']}) maintaining exact legal meaning, formal tone, and all dates, numbers, and references."
+    
+    prompt = f"""{task}
+
+Respond with a JSON object of the form {{"translations": ["...", "..."]}} containing exactly {len(texts)} strings, one per segment, in the same order.
+
+Segments:
+{segments}"""
+    
+    try:
+        print(f"Translating {len(texts)} regions in one batch...")
+        response = ollama.generate(model=model, prompt=prompt, format='json')['response']
+        translations = json.loads(response)
+        if isinstance(translations, dict):
+            translations = translations.get('translations')
+        
+        if (isinstance(translations, list) and len(translations) == len(texts)
+                and all(isinstance(t, str) for t in translations)):
+            print(f"Batch translation to {lang_info['name']} completed")
+            return translations
+        print("Batch translation returned an unexpected shape, translating regions individually")
+    except Exception as e:
+        print(f"Batch translation error: {e}")
+        print("Translating regions individually...")
+    
+    return [translate_one(text, model, target_language) for text in texts]
+
 def fallback_translation(text, target_language):
     """Fallback translation when Ollama is unavailable"""
     print(f"Using fallback translation for {target_language}")
@@ -410,110 +522,32 @@ def get_language_info(lang_code):
     }
     return languages.get(lang_code, {'name': 'Telugu', 'native': 'తెలుగు'})
 
-def create_processed_html(image_path, bboxes, translated_lines, user_actions, target_language='te'):
-    """Create processed HTML document based on user actions"""
-    print("Creating processed HTML document...")
-    
-    # Get language info for font selection
-    lang_info = get_language_info(target_language)
-    
-    # Convert image to base64
-    with open(image_path, 'rb') as img_file:
-        img_data = base64.b64encode(img_file.read()).decode()
-    
-    # Get image dimensions
-    with Image.open(image_path) as img:
-        img_width, img_height = img.size
-    
-    # Create text overlays based on user actions
-    text_overlays = []
-    for i, bbox in enumerate(bboxes):
-        action = user_actions.get(str(i), 'preserve')
-        
-        if action == 'whiteout':
-            # Skip whiteout regions (they won't be rendered)
-            print(f"Whiteout region {i}")
-            continue
-            
-        elif action == 'translate' and i < len(translated_lines):
-            text_to_draw = translated_lines[i].strip()
-            print(f"Translate region {i}")
-        else:
-            text_to_draw = bbox['text']
-            print(f"Preserve region {i}")
-        
-        # Convert bbox coordinates to percentages
-        bbox_coords = bbox['bbox']
-        x_coords = [point[0] for point in bbox_coords]
-        y_coords = [point[1] for point in bbox_coords]
-        x_min, x_max = min(x_coords), max(x_coords)
-        y_min, y_max = min(y_coords), max(y_coords)
-        
-        # Convert to percentages
-        left_pct = (x_min / img_width) * 100
-        top_pct = (y_min / img_height) * 100
-        width_pct = ((x_max - x_min) / img_width) * 100
-        height_pct = ((y_max - y_min) / img_height) * 100
-        
-        # Calculate font size based on height
-        font_size = max(8, min(16, int(height_pct * 0.8)))
-        
-        text_overlays.append({
-            'text': text_to_draw,
-            'left': left_pct,
-            'top': top_pct,
-            'width': width_pct,
-            'height': height_pct,
-            'font_size': font_size,
-            'action': action
-        })
-    
-    # Get appropriate font for the language
-    font_family = get_font_family(target_language)
-    
-    # Create HTML with precise positioning
-    overlays_html = ""
-    for i, overlay in enumerate(text_overlays):
-        overlays_html += f"""
-        <div class="text-overlay {overlay['action']}" style="
-            left: {overlay['left']}%;
-            top: {overlay['top']}%;
-            width: {overlay['width']}%;
-            height: {overlay['height']}%;
-            font-size: {overlay['font_size']}px;
-            box-sizing: border-box;
-            overflow: hidden;
-            word-wrap: break-word;
-        ">
-            {overlay['text']}
-        </div>
-        """
-    
-    html_template = f"""
+# Processed document layout, compiled once by Jinja and cached by name
+_PROCESSED_DOCUMENT_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
-    <title>Processed Document - {lang_info['name']}</title>
+    <title>Processed Document - {{ lang_info['name'] }}</title>
     <style>
-        @import url('https://fonts.googleapis.com/css2?family={font_family}:wght@400;700&display=swap');
+        @import url('https://fonts.googleapis.com/css2?family={{ font_family }}:wght@400;700&display=swap');
         
-        body {{
+        body {
             margin: 0;
             padding: 0;
-            font-family: '{font_family}', Arial, sans-serif;
+            font-family: '{{ font_family }}', Arial, sans-serif;
             background: white;
             position: relative;
-        }}
+        }
         
-        .document-container {{
+        .document-container {
             position: relative;
             width: 100%;
             height: 100vh;
             background: white;
-        }}
+        }
         
-        .background-image {{
+        .background-image {
             position: absolute;
             top: 0;
             left: 0;
@@ -522,9 +556,9 @@ def create_processed_html(image_path, bboxes, translated_lines, user_actions, ta
             opacity: 1.0;
             z-index: 1;
             pointer-events: none;
-        }}
+        }
         
-        .text-overlay {{
+        .text-overlay {
             position: absolute;
             z-index: 2;
             background: rgba(255, 255, 255, 1.0);
@@ -536,50 +570,141 @@ def create_processed_html(image_path, bboxes, translated_lines, user_actions, ta
             padding: 3px;
             box-shadow: none;
             border: none;
-        }}
+        }
         
-        .text-overlay.translate {{
+        .text-overlay.translate {
             background: rgba(255, 255, 255, 1.0);
             border: none;
-        }}
+        }
         
-        .text-overlay.preserve {{
+        .text-overlay.preserve {
             background: rgba(255, 255, 255, 1.0);
             border: none;
-        }}
+        }
         
-        .text-overlay.whiteout {{
+        .text-overlay.whiteout {
             background: rgba(255, 255, 255, 1.0);
             border: none;
-        }}
+        }
         
         /* Print styles */
-        @media print {{
-            body {{ margin: 0; padding: 0; }}
-            .text-overlay {{ background: white; }}
-        }}
+        @media print {
+            body { margin: 0; padding: 0; }
+            .text-overlay { background: white; }
+        }
         
         /* Responsive adjustments */
-        @media (max-width: 768px) {{
-            .text-overlay {{
+        @media (max-width: 768px) {
+            .text-overlay {
                 font-size: 10px !important;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
     <div class="document-container">
         <!-- Background image with full opacity to preserve logo/signatures -->
-        <img src="data:image/png;base64,{img_data}" class="background-image" alt="Original Document">
+        <img src="data:image/png;base64,{{ img_data }}" class="background-image" alt="Original Document">
         
         <!-- Text overlays positioned exactly like original -->
-        {overlays_html}
+        {% for overlay in text_overlays %}
+        <div class="text-overlay {{ overlay['action'] }}" style="
+            left: {{ overlay['left'] }}%;
+            top: {{ overlay['top'] }}%;
+            width: {{ overlay['width'] }}%;
+            height: {{ overlay['height'] }}%;
+            font-size: {{ overlay['font_size'] }}px;
+            box-sizing: border-box;
+            overflow: hidden;
+            word-wrap: break-word;
+        ">
+            {{ overlay['text'] }}
+        </div>
+        {% endfor %}
     </div>
 </body>
 </html>
 """
+
+# Templates never change at runtime outside of debug mode, so skip the
+# up-to-date check on every render
+_template_env = Environment(
+    loader=DictLoader({'processed_document.html': _PROCESSED_DOCUMENT_TEMPLATE}),
+    autoescape=True,
+    auto_reload=app.debug,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    cache_size=400
+)
+
+def create_processed_html(image_path, bboxes, translated_lines, user_actions, target_language='te'):
+    """Create processed HTML document based on user actions"""
+    print("Creating processed HTML document...")
+    
+    # Get language info for font selection
+    lang_info = get_language_info(target_language)
+    
+    # Convert image to base64
+    with open(image_path, 'rb') as img_file:
+        img_data = base64.b64encode(img_file.read()).decode()
+    
+    # Get image dimensions
+    with Image.open(image_path) as img:
+        img_width, img_height = img.size
+    
+    # Create text overlays based on user actions
+    text_overlays = []
+    for i, bbox in enumerate(bboxes):
+        action = user_actions.get(str(i), 'preserve')
+        
+        if action == 'whiteout':
+            # Skip whiteout regions (they won't be rendered)
+            print(f"Whiteout region {i}")
+            continue
+            
+        elif action == 'translate' and i < len(translated_lines):
+            text_to_draw = translated_lines[i].strip()
+            print(f"Translate region {i}")
+        else:
+            text_to_draw = bbox['text']
+            print(f"Preserve region {i}")
+        
+        # Convert bbox coordinates to percentages
+        bbox_coords = bbox['bbox']
+        x_coords = [point[0] for point in bbox_coords]
+        y_coords = [point[1] for point in bbox_coords]
+        x_min, x_max = min(x_coords), max(x_coords)
+        y_min, y_max = min(y_coords), max(y_coords)
+        
+        # Convert to percentages
+        left_pct = (x_min / img_width) * 100
+        top_pct = (y_min / img_height) * 100
+        width_pct = ((x_max - x_min) / img_width) * 100
+        height_pct = ((y_max - y_min) / img_height) * 100
+        
+        # Calculate font size based on height
+        font_size = max(8, min(16, int(height_pct * 0.8)))
+        
+        text_overlays.append({
+            'text': text_to_draw,
+            'left': left_pct,
+            'top': top_pct,
+            'width': width_pct,
+            'height': height_pct,
+            'font_size': font_size,
+            'action': action
+        })
+    
+    # Get appropriate font for the language
+    font_family = get_font_family(target_language)
     
-    return html_template
+    # Render with the precompiled template (positions are precise percentages)
+    return _template_env.get_template('processed_document.html').render(
+        lang_info=lang_info,
+        font_family=font_family,
+        img_data=img_data,
+        text_overlays=text_overlays
+    )
 
 def get_font_family(lang_code):
     """Get appropriate Google Font family for the language"""
@@ -597,28 +722,69 @@ def get_font_family(lang_code):
     }
     return font_families.get(lang_code, 'Noto+Sans+Telugu')
 
+def precompressed_response(data, gzip_data, br_data, mimetype):
+    """Respond with the best pre-compressed variant the client accepts"""
+    if br_data is not None and request.accept_encodings['br']:
+        response = Response(br_data, mimetype=mimetype)
+        response.headers['Content-Encoding'] = 'br'
+    elif request.accept_encodings['gzip']:
+        response = Response(gzip_data, mimetype=mimetype)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(data, mimetype=mimetype)
+    return response
+
 @app.route('/')
 def index():
     """Serve the main HTML page"""
-    return create_dynamic_ui()
+    # The UI only changes between deployments, so a matching ETag means the
+    # browser already holds the current page
+    if request.if_none_match.contains_weak(_DYNAMIC_UI_ETAG):
+        response = Response(status=304)
+    else:
+        response = precompressed_response(_DYNAMIC_UI_BYTES, _DYNAMIC_UI_GZ, _DYNAMIC_UI_BR, 'text/html')
+    
+    response.set_etag(_DYNAMIC_UI_ETAG, weak=True)
+    response.headers['Cache-Control'] = 'public, no-cache'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+@app.route('/assets/<filename>')
+def ui_asset(filename):
+    """Serve a content-hashed UI asset"""
+    asset = UI_ASSETS.get(filename)
+    if asset is None:
+        return json_error('Asset not found', 404)
+    
+    data, gzip_data, br_data, mimetype = asset
+    response = precompressed_response(data, gzip_data, br_data, mimetype)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 @app.route('/upload', methods=['POST'])
 def upload_image():
     """Handle image upload and OCR processing"""
     global current_image, current_bboxes, current_translated_text, current_image_path, current_target_language
+    global current_user_actions, current_actions_version
     
     try:
         # Get uploaded file
         file = request.files['image']
         if not file:
-            return jsonify({'error': 'No image uploaded'}), 400
+            return json_error('No image uploaded', 400)
         
-        # Save uploaded file
-        filename = file.filename
-        file_path = os.path.join(tempfile.gettempdir(), filename)
-        file.save(file_path)
+        # The upload was already spooled to disk while parsing the request
+        file.stream.flush()
+        file_path = file.stream.name
         
+        # Drop the previous upload now that it has been replaced
+        if current_image_path and current_image_path != file_path and os.path.exists(current_image_path):
+            os.remove(current_image_path)
         current_image_path = file_path
+        with actions_lock:
+            current_user_actions = {}
+            current_actions_version += 1
         
         # Process with OCR
         bboxes = process_image_with_ocr(file_path)
@@ -647,19 +813,23 @@ def upload_image():
         
         print(f"DEBUG: Model={model}, AgentMode={agent_mode}, TargetLang={target_language}")
         
-        # Translate each text region individually
-        translated_lines = []
-        for i, bbox in enumerate(bboxes):
-            region_text = bbox['text']
-            print(f"DEBUG: Translating region {i+1}: '{region_text[:50]}...'")
-            
-            if agent_mode:
-                region_translated = translate_text_with_agents(region_text, model, target_language)
-            else:
-                region_translated = translate_text(region_text, model, target_language)
+        # Translate each distinct region text once, in batches; repeated headers and
+        # boilerplate reuse the same translation
+        region_texts = [bbox['text'] for bbox in bboxes]
+        unique_texts = list(dict.fromkeys(region_texts))
+        print(f"DEBUG: {len(region_texts)} regions, {len(unique_texts)} unique texts")
+        
+        translations = {}
+        for start in range(0, len(unique_texts), TRANSLATION_BATCH_SIZE):
+            batch_texts = unique_texts[start:start + TRANSLATION_BATCH_SIZE]
+            print(f"DEBUG: Translating unique texts {start+1}-{start+len(batch_texts)}")
             
-            print(f"DEBUG: Region {i+1} translated: '{region_translated[:50]}...'")
-            translated_lines.append(region_translated)
+            batch_translated = translate_batch(batch_texts, model, target_language, agent_mode)
+            for i, region_translated in enumerate(batch_translated, start + 1):
+                print(f"DEBUG: Text {i} translated: '{region_translated[:50]}...'")
+            translations.update(zip(batch_texts, batch_translated))
+        
+        translated_lines = [translations[text] for text in region_texts]
         
         current_translated_text = translated_lines
         
@@ -703,19 +873,48 @@ def upload_image():
         return jsonify(response_data)
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_error(str(e), 500)
 
 @app.route('/process', methods=['POST'])
 def process_document():
     """Process document with user actions"""
     global current_image_path, current_bboxes, current_translated_text, current_target_language
+    global current_user_actions, current_actions_version
     
     try:
         data = request.get_json()
-        user_actions = data.get('actions', {})
+        base_version = data.get('base_version')
+        if 'action_codes' in data:
+            # Full action map packed as one byte per region, indexing action_names
+            action_names = data.get('action_names')
+            if not isinstance(action_names, list) or not all(name in REGION_ACTIONS for name in action_names):
+                return json_error(f'action_names must only contain {", ".join(REGION_ACTIONS)}', 400)
+            try:
+                action_codes = base64.b64decode(data['action_codes'], validate=True)
+            except (TypeError, ValueError):
+                return json_error('action_codes is not valid base64', 400)
+            if any(code >= len(action_names) for code in action_codes):
+                return json_error('action_codes refers to an action missing from action_names', 400)
+            actions = {str(i): action_names[code] for i, code in enumerate(action_codes)}
+        else:
+            actions = data.get('actions', {})
         
         if not current_image_path or not current_bboxes:
-            return jsonify({'error': 'No image processed'}), 400
+            return json_error('No image processed', 400)
+        
+        with actions_lock:
+            if base_version is None:
+                # Full action map
+                current_user_actions = dict(actions)
+            elif base_version == current_actions_version:
+                # Only the actions that changed since base_version
+                current_user_actions.update(actions)
+            else:
+                return json_error('Region actions are out of date, send the full action map', 409)
+            current_actions_version += 1
+            actions_version = current_actions_version
+            # Render from a snapshot, so a concurrent update cannot change it mid-render
+            user_actions = dict(current_user_actions)
         
         # Create processed HTML document
         processed_html = create_processed_html(
@@ -731,14 +930,13 @@ def process_document():
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(processed_html)
         
-        return jsonify({
-            'success': True,
-            'processed_html': processed_html,
-            'download_url': '/download_html'
-        })
+        # Raw HTML, so the client can hand the body straight to a Blob without JSON-decoding it
+        response = Response(processed_html, mimetype='text/html')
+        response.headers['X-Actions-Version'] = str(actions_version)
+        return response
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_error(str(e), 500)
 
 @app.route('/download_html')
 def download_html_document():
@@ -746,42 +944,68 @@ def download_html_document():
     try:
         output_path = os.path.join(tempfile.gettempdir(), 'processed_document.html')
         if os.path.exists(output_path):
-            return send_file(output_path, as_attachment=True, download_name='translated_document.html')
+            return send_file(output_path, as_attachment=True, download_name='translated_document.html', conditional=True)
         else:
-            return jsonify({'error': 'No processed document available'}), 404
+            return Response(NO_DOCUMENT_ERROR_BODY, status=404, mimetype='application/json')
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_error(str(e), 500)
+
+def format_size(num_bytes):
+    """Format a byte count as a short size label, e.g. '4.1GB'"""
+    if not num_bytes:
+        return ''
+    
+    size = float(num_bytes)
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+def list_ollama_models():
+    """Return the installed Ollama models, cached for MODEL_LIST_TTL seconds"""
+    with model_list_lock:
+        if model_list_cache['models'] is None or time.monotonic() >= model_list_cache['expires']:
+            # Get list of available models
+            models = ollama.list()
+            model_list = []
+            
+            for model in models['models']:
+                model_info = {
+                    'name': model.model,
+                    'size': model.size,
+                    'size_label': format_size(model.size),
+                    'modified_at': str(model.modified_at) if model.modified_at else '',
+                    'family': model.details.family if model.details else 'unknown'
+                }
+                model_list.append(model_info)
+            
+            model_list_cache['models'] = model_list
+            model_list_cache['expires'] = time.monotonic() + MODEL_LIST_TTL
+        
+        return model_list_cache['models']
 
 @app.route('/api/ollama/models', methods=['GET'])
 def get_ollama_models():
     """Get available Ollama models"""
     try:
-        # Get list of available models
-        models = ollama.list()
-        model_list = []
-        
-        for model in models['models']:
-            model_info = {
-                'name': model.model,
-                'size': model.size,
-                'modified_at': str(model.modified_at) if model.modified_at else '',
-                'family': model.details.family if model.details else 'unknown'
-            }
-            model_list.append(model_info)
+        model_list = list_ollama_models()
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'models': model_list
         })
+        response.headers['Cache-Control'] = f'private, max-age={MODEL_LIST_TTL}'
+        return response
         
     except Exception as e:
         print(f"Error getting Ollama models: {e}")
         # Fallback to default models if Ollama is not available
         fallback_models = [
-            {'name': 'gemma3-legal-samanantar-pro:latest', 'family': 'gemma', 'size': 0},
-            {'name': 'llama3.1:8b', 'family': 'llama', 'size': 0},
-            {'name': 'gemma3:4b', 'family': 'gemma', 'size': 0},
-            {'name': 'gaganyatri/sarvam-2b-v0.5:latest', 'family': 'sarvam', 'size': 0}
+            {'name': 'gemma3-legal-samanantar-pro:latest', 'family': 'gemma', 'size': 0, 'size_label': ''},
+            {'name': 'llama3.1:8b', 'family': 'llama', 'size': 0, 'size_label': ''},
+            {'name': 'gemma3:4b', 'family': 'gemma', 'size': 0, 'size_label': ''},
+            {'name': 'gaganyatri/sarvam-2b-v0.5:latest', 'family': 'sarvam', 'size': 0, 'size_label': ''}
         ]
         return jsonify({
             'success': True,
@@ -813,7 +1037,7 @@ def debug_translation():
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_error(str(e), 500)
 
 @app.route('/api/ollama', methods=['POST'])
 def ollama_api():
@@ -824,12 +1048,31 @@ def ollama_api():
         prompt = data.get('prompt', '')
         
         if not prompt:
-            return jsonify({'error': 'No prompt provided'}), 400
+            return json_error('No prompt provided', 400)
+        
+        # Optional Ollama generation settings forwarded from the agents
+        generate_kwargs = {key: data[key] for key in ('format', 'options') if data.get(key)}
+        
+        if data.get('stream'):
+            # Pull the first chunk up front so an unavailable Ollama still gets a 503
+            chunks = ollama.generate(model=model, prompt=prompt, stream=True, **generate_kwargs)
+            first_chunk = next(chunks)
+            
+            def generate_ndjson():
+                try:
+                    for chunk in itertools.chain([first_chunk], chunks):
+                        yield json.dumps({'response': chunk['response'], 'done': chunk['done']}) + '\n'
+                except Exception as e:
+                    print(f"Ollama API stream error: {e}")
+                    yield json.dumps({'error': str(e), 'done': True}) + '\n'
+            
+            return Response(generate_ndjson(), mimetype='application/x-ndjson')
         
         # Call Ollama
         translated_text = ollama.generate(
             model=model,
-            prompt=prompt
+            prompt=prompt,
+            **generate_kwargs
         )['response']
         
         return jsonify({
@@ -854,23 +1097,39 @@ def download_document():
     try:
         output_path = os.path.join(tempfile.gettempdir(), 'processed_document.png')
         if os.path.exists(output_path):
-            return send_file(output_path, as_attachment=True, download_name='translated_document.png')
+            return send_file(output_path, as_attachment=True, download_name='translated_document.png', conditional=True)
         else:
-            return jsonify({'error': 'No processed document available'}), 404
+            return Response(NO_DOCUMENT_ERROR_BODY, status=404, mimetype='application/json')
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-def create_dynamic_ui():
-    """Create the dynamic UI with real backend integration"""
-    
-    html_content = """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Dynamic Document Translator</title>
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+Telugu:wght@400;700&display=swap');
+        return json_error(str(e), 500)
+
+# Static UI assets, served under content-hashed names so browsers can keep
+# them cached until the content changes
+UI_ASSETS = {}
+UI_MINIFIERS = {'css': cssmin, 'js': jsmin} if MINIFIERS_AVAILABLE else {}
+
+def register_ui_asset(stem, extension, content, mimetype):
+    """Register a UI asset under a content-hashed filename and return its URL"""
+    minify = UI_MINIFIERS.get(extension)
+    if minify:
+        content = minify(content)
+    data = content.encode('utf-8')
+    filename = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{extension}"
+    # Compressed once here rather than per request
+    gzip_data = gzip.compress(data, compresslevel=9)
+    br_data = brotli.compress(data, quality=11) if BROTLI_AVAILABLE else None
+    UI_ASSETS[filename] = (data, gzip_data, br_data, mimetype)
+    return f"/assets/{filename}"
+
+_DYNAMIC_UI_CSS = """
+        :root {
+            --panel: #111;
+            --panel-raised: #1a1a1a;
+            --panel-hover: #222;
+            --border: #333;
+            --border-hover: #666;
+            --radius: 10px;
+        }
         
         * {
             margin: 0;
@@ -879,7 +1138,7 @@ def create_dynamic_ui():
         }
         
         body {
-            font-family: 'Segoe UI', Arial, sans-serif;
+            font-family: 'Segoe UI', Arial, 'Noto Sans Telugu', sans-serif;
             background: #000;
             color: #fff;
             min-height: 100vh;
@@ -910,23 +1169,23 @@ def create_dynamic_ui():
         }
         
         .upload-section {
-            background: #111;
-            border: 2px dashed #333;
-            border-radius: 10px;
+            background: var(--panel);
+            border: 2px dashed var(--border);
+            border-radius: var(--radius);
             padding: 40px;
             text-align: center;
             margin-bottom: 30px;
-            transition: all 0.3s ease;
+            transition: background-color 0.3s ease, border-color 0.3s ease;
         }
         
         .upload-section:hover {
-            border-color: #666;
-            background: #1a1a1a;
+            border-color: var(--border-hover);
+            background: var(--panel-raised);
         }
         
         .upload-section.dragover {
             border-color: #fff;
-            background: #222;
+            background: var(--panel-hover);
         }
         
         .upload-icon {
@@ -952,7 +1211,7 @@ def create_dynamic_ui():
             border-radius: 5px;
             font-size: 1em;
             cursor: pointer;
-            transition: all 0.3s ease;
+            transition: background-color 0.3s ease;
         }
         
         .upload-btn:hover {
@@ -960,8 +1219,8 @@ def create_dynamic_ui():
         }
         
         .model-selection-section {
-            background: #111;
-            border-radius: 10px;
+            background: var(--panel);
+            border-radius: var(--radius);
             padding: 30px;
             margin-bottom: 30px;
         }
@@ -974,18 +1233,18 @@ def create_dynamic_ui():
         }
         
         .model-card {
-            background: #1a1a1a;
-            border: 2px solid #333;
-            border-radius: 10px;
+            background: var(--panel-raised);
+            border: 2px solid var(--border);
+            border-radius: var(--radius);
             padding: 20px;
             text-align: center;
             cursor: pointer;
-            transition: all 0.3s ease;
+            transition: background-color 0.3s ease, border-color 0.3s ease;
         }
         
         .model-card:hover {
-            border-color: #666;
-            background: #222;
+            border-color: var(--border-hover);
+            background: var(--panel-hover);
         }
         
         .model-card.selected {
@@ -1032,7 +1291,7 @@ def create_dynamic_ui():
             background: #333;
             border-radius: 15px;
             position: relative;
-            transition: all 0.3s ease;
+            transition: background-color 0.3s ease;
         }
         
         .toggle-slider::before {
@@ -1044,7 +1303,7 @@ def create_dynamic_ui():
             border-radius: 50%;
             top: 2px;
             left: 2px;
-            transition: all 0.3s ease;
+            transition: transform 0.3s ease;
         }
         
         .toggle-label input[type="checkbox"]:checked + .toggle-slider {
@@ -1082,7 +1341,7 @@ def create_dynamic_ui():
         .loading-spinner {
             width: 60px;
             height: 60px;
-            border: 4px solid #333;
+            border: 4px solid var(--border);
             border-top: 4px solid #fff;
             border-radius: 50%;
             animation: spin 1s linear infinite;
@@ -1119,9 +1378,9 @@ def create_dynamic_ui():
         }
         
         .model-loading-card {
-            background: #1a1a1a;
-            border: 2px solid #333;
-            border-radius: 10px;
+            background: var(--panel-raised);
+            border: 2px solid var(--border);
+            border-radius: var(--radius);
             padding: 40px;
             text-align: center;
             grid-column: 1 / -1;
@@ -1150,18 +1409,18 @@ def create_dynamic_ui():
         }
         
         .language-card {
-            background: #1a1a1a;
-            border: 2px solid #333;
+            background: var(--panel-raised);
+            border: 2px solid var(--border);
             border-radius: 8px;
             padding: 15px;
             text-align: center;
             cursor: pointer;
-            transition: all 0.3s ease;
+            transition: background-color 0.3s ease, border-color 0.3s ease;
         }
         
         .language-card:hover {
-            border-color: #666;
-            background: #222;
+            border-color: var(--border-hover);
+            background: var(--panel-hover);
         }
         
         .language-card.selected {
@@ -1187,8 +1446,8 @@ def create_dynamic_ui():
         
         .processing-section {
             display: none;
-            background: #111;
-            border-radius: 10px;
+            background: var(--panel);
+            border-radius: var(--radius);
             padding: 30px;
             margin-bottom: 30px;
         }
@@ -1199,11 +1458,11 @@ def create_dynamic_ui():
             margin-bottom: 15px;
             padding: 10px;
             border-radius: 5px;
-            transition: all 0.3s ease;
+            transition: background-color 0.3s ease;
         }
         
         .processing-step.active {
-            background: #222;
+            background: var(--panel-hover);
         }
         
         .processing-step.completed {
@@ -1244,8 +1503,8 @@ def create_dynamic_ui():
         }
         
         .image-section {
-            background: #111;
-            border-radius: 10px;
+            background: var(--panel);
+            border-radius: var(--radius);
             padding: 20px;
         }
         
@@ -1256,16 +1515,18 @@ def create_dynamic_ui():
         
         .document-image {
             max-width: 100%;
-            border: 1px solid #333;
+            border: 1px solid var(--border);
             border-radius: 5px;
         }
         
         .bbox-overlay {
             position: absolute;
+            top: 0;
+            left: 0;
             border: 2px solid #fff;
             background: rgba(255, 255, 255, 0.1);
             cursor: pointer;
-            transition: all 0.3s ease;
+            transition: background-color 0.3s ease, border-color 0.3s ease;
         }
         
         .bbox-overlay:hover {
@@ -1288,31 +1549,31 @@ def create_dynamic_ui():
         }
         
         .controls-section {
-            background: #111;
-            border-radius: 10px;
+            background: var(--panel);
+            border-radius: var(--radius);
             padding: 20px;
         }
         
         .section-title {
             font-size: 1.5em;
             margin-bottom: 20px;
-            border-bottom: 1px solid #333;
+            border-bottom: 1px solid var(--border);
             padding-bottom: 10px;
         }
         
         .text-region {
-            background: #1a1a1a;
-            border: 1px solid #333;
+            background: var(--panel-raised);
+            border: 1px solid var(--border);
             border-radius: 5px;
             padding: 15px;
             margin-bottom: 15px;
             cursor: pointer;
-            transition: all 0.3s ease;
+            transition: background-color 0.3s ease, border-color 0.3s ease;
         }
         
         .text-region:hover {
-            border-color: #666;
-            background: #222;
+            border-color: var(--border-hover);
+            background: var(--panel-hover);
         }
         
         .text-region.selected {
@@ -1360,7 +1621,7 @@ def create_dynamic_ui():
             border-radius: 3px;
             cursor: pointer;
             font-size: 0.9em;
-            transition: all 0.3s ease;
+            transition: background-color 0.3s ease, color 0.3s ease;
         }
         
         .control-btn:hover {
@@ -1393,7 +1654,7 @@ def create_dynamic_ui():
             border-radius: 5px;
             font-size: 1.1em;
             cursor: pointer;
-            transition: all 0.3s ease;
+            transition: background-color 0.3s ease, color 0.3s ease;
         }
         
         .action-btn:hover {
@@ -1408,15 +1669,15 @@ def create_dynamic_ui():
         
         .preview-section {
             display: none;
-            background: #111;
-            border-radius: 10px;
+            background: var(--panel);
+            border-radius: var(--radius);
             padding: 30px;
             text-align: center;
         }
         
         .preview-image {
             max-width: 100%;
-            border: 1px solid #333;
+            border: 1px solid var(--border);
             border-radius: 5px;
             margin-bottom: 20px;
         }
@@ -1429,7 +1690,7 @@ def create_dynamic_ui():
             border-radius: 5px;
             font-size: 1em;
             cursor: pointer;
-            transition: all 0.3s ease;
+            transition: background-color 0.3s ease;
         }
         
         .download-btn:hover {
@@ -1458,144 +1719,34 @@ def create_dynamic_ui():
             background: #006;
             color: #fff;
         }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>Dynamic Document Translator</h1>
-            <p>Upload any document image and control every text region</p>
-        </div>
+"""
+
+_DYNAMIC_UI_CSS_URL = register_ui_asset('dynamic_ui', 'css', _DYNAMIC_UI_CSS, 'text/css')
+
+_DYNAMIC_UI_JS = """
+        let documentData = null;
+        let textRegions = [];
+        // Overlay, text region and button nodes per region id, recorded as they are created
+        const regionNodes = new Map();
+        let selectedRegionId = null;
+        let translatedText = [];
+        // One action code per region id, indexing REGION_ACTIONS; 0 is the server's default
+        const REGION_ACTIONS = ['preserve', 'translate', 'whiteout'];
+        let userActions = new Uint8Array(0);
+        let selectedModel = 'gemma3-legal-samanantar-pro:latest';
+        let agentMode = true;
+        let selectedLanguage = 'te'; // Default to Telugu
         
-        <div class="upload-section" id="uploadSection">
-            <div class="upload-icon">📄</div>
-            <div class="upload-text">Drag & drop your document image here or click to browse</div>
-            <input type="file" id="fileInput" class="file-input" accept="image/*">
-            <button class="upload-btn" onclick="document.getElementById('fileInput').click()">Choose File</button>
-        </div>
-        
-        <div class="model-selection-section">
-            <div class="section-title">🤖 Choose Translation Model</div>
-            <div class="model-grid" id="modelGrid">
-                <div class="model-loading-card">
-                    <div class="loading-spinner"></div>
-                    <div class="loading-text">Loading available models...</div>
-                </div>
-            </div>
-            <div class="translation-options">
-                <div class="section-title">🌐 Translation Options</div>
-                <div class="language-grid">
-                    <div class="language-card" data-lang="te">
-                        <div class="language-icon">📜</div>
-                        <div class="language-name">Telugu</div>
-                        <div class="language-desc">తెలుగు</div>
-                    </div>
-                    <div class="language-card" data-lang="hi">
-                        <div class="language-icon">📖</div>
-                        <div class="language-name">Hindi</div>
-                        <div class="language-desc">हिन्दी</div>
-                    </div>
-                    <div class="language-card" data-lang="ta">
-                        <div class="language-icon">📚</div>
-                        <div class="language-name">Tamil</div>
-                        <div class="language-desc">தமிழ்</div>
-                    </div>
-                    <div class="language-card" data-lang="kn">
-                        <div class="language-icon">📝</div>
-                        <div class="language-name">Kannada</div>
-                        <div class="language-desc">ಕನ್ನಡ</div>
-                    </div>
-                    <div class="language-card" data-lang="ml">
-                        <div class="language-icon">📄</div>
-                        <div class="language-name">Malayalam</div>
-                        <div class="language-desc">മലയാളം</div>
-                    </div>
-                    <div class="language-card" data-lang="en">
-                        <div class="language-icon">📰</div>
-                        <div class="language-name">English</div>
-                        <div class="language-desc">Improved</div>
-                    </div>
-                </div>
-            </div>
-            <div class="agent-mode-toggle">
-                <label class="toggle-label">
-                    <input type="checkbox" id="agentModeToggle" checked>
-                    <span class="toggle-slider"></span>
-                    <span class="toggle-text">🚀 Agentic Framework (Multi-Agent Pipeline)</span>
-                </label>
-            </div>
-        </div>
-        
-        <!-- Loading Overlay -->
-        <div class="loading-overlay" id="loadingOverlay">
-            <div class="loading-content">
-                <div class="loading-spinner"></div>
-                <div class="loading-text" id="loadingText">Processing...</div>
-                <div class="loading-subtext" id="loadingSubtext">Please wait</div>
-            </div>
-        </div>
-        
-        <div class="processing-section" id="processingSection">
-            <div class="section-title">Processing Document</div>
-            <div class="processing-step" id="step1">
-                <div class="step-icon">1</div>
-                <div class="step-text">Extracting text with OCR...</div>
-            </div>
-            <div class="processing-step" id="step2">
-                <div class="step-icon">2</div>
-                <div class="step-text">Translating text...</div>
-            </div>
-            <div class="processing-step" id="step3">
-                <div class="step-icon">3</div>
-                <div class="step-text">Preparing layout controls...</div>
-            </div>
-        </div>
-        
-        <div class="main-content" id="mainContent">
-            <div class="image-section">
-                <div class="section-title">Document Preview</div>
-                <div class="image-container" id="imageContainer">
-                    <img id="documentImage" class="document-image" alt="Document Preview">
-                </div>
-            </div>
-            
-            <div class="controls-section">
-                <div class="section-title">Text Region Controls</div>
-                <div class="status-message" id="statusMessage"></div>
-                <div id="textRegions"></div>
-                <div class="action-buttons">
-                    <button class="action-btn" id="previewBtn" onclick="previewDocument()">Preview Document</button>
-                    <button class="action-btn" id="downloadBtn" onclick="downloadDocument()">Download Result</button>
-                </div>
-            </div>
-        </div>
-        
-        <div class="preview-section" id="previewSection">
-            <div class="section-title">Final Document Preview</div>
-            <img id="previewImage" class="preview-image" alt="Final Document Preview">
-            <button class="download-btn" onclick="downloadDocument()">📥 Download HTML Document</button>
-        </div>
-    </div>
-    
-    <script>
-        let documentData = null;
-        let textRegions = [];
-        let translatedText = [];
-        let userActions = {};
-        let selectedModel = 'gemma3-legal-samanantar-pro:latest';
-        let agentMode = true;
-        let selectedLanguage = 'te'; // Default to Telugu
-        
-        // Loading functions
-        function showLoading(text = 'Processing...', subtext = 'Please wait') {
-            const overlay = document.getElementById('loadingOverlay');
-            const loadingText = document.getElementById('loadingText');
-            const loadingSubtext = document.getElementById('loadingSubtext');
-            
-            loadingText.textContent = text;
-            loadingSubtext.textContent = subtext;
-            overlay.style.display = 'flex';
-        }
+        // Loading functions
+        function showLoading(text = 'Processing...', subtext = 'Please wait') {
+            const overlay = document.getElementById('loadingOverlay');
+            const loadingText = document.getElementById('loadingText');
+            const loadingSubtext = document.getElementById('loadingSubtext');
+            
+            loadingText.textContent = text;
+            loadingSubtext.textContent = subtext;
+            overlay.style.display = 'flex';
+        }
         
         function hideLoading() {
             const overlay = document.getElementById('loadingOverlay');
@@ -1604,6 +1755,7 @@ def create_dynamic_ui():
         
         // Model selection handling
         document.addEventListener('DOMContentLoaded', function() {
+            setupModelSelection();
             loadAvailableModels();
             setupLanguageSelection();
             
@@ -1617,44 +1769,103 @@ def create_dynamic_ui():
             }
         });
         
+        // localStorage can be unavailable (private mode, disabled storage)
+        function readStoredValue(key) {
+            try {
+                return localStorage.getItem(key);
+            } catch (error) {
+                return null;
+            }
+        }
+        
+        function storeValue(key, value) {
+            try {
+                localStorage.setItem(key, value);
+            } catch (error) {
+                // Persistence is best effort only
+            }
+        }
+        
         function setupLanguageSelection() {
-            // Set default language selection
-            const defaultLangCard = document.querySelector('[data-lang="te"]');
+            // The language cards are static, so look them up once
+            const languageGrid = document.querySelector('.language-grid');
+            const languageCards = Array.from(languageGrid.children);
+            
+            // Restore the last selected language, defaulting to Telugu
+            const storedLanguage = readStoredValue('selected_language');
+            const defaultLangCard = languageCards.find(card => card.dataset.lang === storedLanguage) ||
+                languageCards.find(card => card.dataset.lang === 'te');
             if (defaultLangCard) {
                 defaultLangCard.classList.add('selected');
+                selectedLanguage = defaultLangCard.dataset.lang;
             }
             
-            // Language card selection
-            document.querySelectorAll('.language-card').forEach(card => {
-                card.addEventListener('click', function() {
-                    document.querySelectorAll('.language-card').forEach(c => c.classList.remove('selected'));
-                    this.classList.add('selected');
-                    selectedLanguage = this.dataset.lang;
-                    console.log('Selected language:', selectedLanguage);
-                });
+            // Language card selection (one delegated handler for the whole grid)
+            languageGrid.addEventListener('click', function(e) {
+                const card = e.target.closest('.language-card');
+                if (!card) return;
+                languageCards.forEach(c => c.classList.remove('selected'));
+                card.classList.add('selected');
+                selectedLanguage = card.dataset.lang;
+                storeValue('selected_language', selectedLanguage);
+                console.log('Selected language:', selectedLanguage);
             });
         }
         
+        function setupModelSelection() {
+            // Cards are re-rendered when models load, so listen on the grid once.
+            // The grid's children collection is live and always holds the current cards.
+            const modelGrid = document.getElementById('modelGrid');
+            const modelCards = modelGrid.children;
+            modelGrid.addEventListener('click', function(e) {
+                const card = e.target.closest('.model-card');
+                if (!card) return;
+                for (const c of modelCards) c.classList.remove('selected');
+                card.classList.add('selected');
+                selectedModel = card.dataset.model;
+                storeValue('selected_model', selectedModel);
+                console.log('Selected model:', selectedModel);
+            });
+        }
+        
+        const MODEL_CACHE_KEY = 'ollama_models';
+        const MODEL_CACHE_MAX_AGE = 60000;
+        
         async function loadAvailableModels() {
+            // Render a recent model list straight away, then revalidate it in the background
+            let cached = null;
+            try {
+                cached = JSON.parse(readStoredValue(MODEL_CACHE_KEY) || 'null');
+            } catch (error) {
+                cached = null;
+            }
+            const hasFreshCache = cached && Date.now() - cached.ts < MODEL_CACHE_MAX_AGE;
+            if (hasFreshCache) {
+                renderModels(cached.models);
+            }
+            
             try {
                 const response = await fetch('/api/ollama/models');
                 const data = await response.json();
                 
                 if (data.success) {
                     renderModels(data.models);
+                    if (!data.fallback) {
+                        storeValue(MODEL_CACHE_KEY, JSON.stringify({ ts: Date.now(), models: data.models }));
+                    }
                 } else {
                     console.error('Failed to load models:', data.error);
-                    renderFallbackModels();
+                    if (!hasFreshCache) renderFallbackModels();
                 }
             } catch (error) {
                 console.error('Error loading models:', error);
-                renderFallbackModels();
+                if (!hasFreshCache) renderFallbackModels();
             }
         }
         
         function renderModels(models) {
             const modelGrid = document.getElementById('modelGrid');
-            modelGrid.innerHTML = '';
+            const fragment = document.createDocumentFragment();
             
             // Sort models by family and name
             models.sort((a, b) => {
@@ -1665,44 +1876,22 @@ def create_dynamic_ui():
             });
             
             models.forEach((model, index) => {
-                const modelCard = document.createElement('div');
-                modelCard.className = 'model-card';
-                modelCard.dataset.model = model.name;
-                
                 // Get icon based on family
                 const icon = getModelIcon(model.family);
-                const sizeText = model.size > 0 ? formatBytes(model.size) : '';
-                
-                modelCard.innerHTML = `
-                    <div class="model-icon">${icon}</div>
-                    <div class="model-name">${model.name}</div>
-                    <div class="model-desc">${model.family} ${sizeText}</div>
-                `;
+                const sizeText = model.size_label ? `(${model.size_label})` : '';
                 
-                // Add click handler
-                modelCard.addEventListener('click', function() {
-                    document.querySelectorAll('.model-card').forEach(c => c.classList.remove('selected'));
-                    this.classList.add('selected');
-                    selectedModel = this.dataset.model;
-                    console.log('Selected model:', selectedModel);
-                });
-                
-                modelGrid.appendChild(modelCard);
+                fragment.appendChild(createModelCard(model.name, icon, `${model.family} ${sizeText}`));
             });
             
-            // Select first model by default
-            if (models.length > 0) {
-                const firstCard = modelGrid.querySelector('.model-card');
-                if (firstCard) {
-                    firstCard.classList.add('selected');
-                    selectedModel = firstCard.dataset.model;
-                }
-            }
+            // Swap all cards in with a single DOM mutation
+            modelGrid.replaceChildren(fragment);
+            
+            selectInitialModel(modelGrid);
         }
         
         function renderFallbackModels() {
             const modelGrid = document.getElementById('modelGrid');
-            modelGrid.innerHTML = '';
+            const fragment = document.createDocumentFragment();
             
             const fallbackModels = [
                 { name: 'gemma3-legal-samanantar-pro:latest', family: 'gemma', icon: '⚖️' },
@@ -1712,34 +1901,47 @@ def create_dynamic_ui():
             ];
             
             fallbackModels.forEach(model => {
-                const modelCard = document.createElement('div');
-                modelCard.className = 'model-card';
-                modelCard.dataset.model = model.name;
-                
-                modelCard.innerHTML = `
-                    <div class="model-icon">${model.icon}</div>
-                    <div class="model-name">${model.name}</div>
-                    <div class="model-desc">${model.family} (fallback)</div>
-                `;
-                
-                modelCard.addEventListener('click', function() {
-                    document.querySelectorAll('.model-card').forEach(c => c.classList.remove('selected'));
-                    this.classList.add('selected');
-                    selectedModel = this.dataset.model;
-                    console.log('Selected model:', selectedModel);
-                });
-                
-                modelGrid.appendChild(modelCard);
+                fragment.appendChild(createModelCard(model.name, model.icon, `${model.family} (fallback)`));
             });
             
-            // Select first model by default
-            const firstCard = modelGrid.querySelector('.model-card');
-            if (firstCard) {
-                firstCard.classList.add('selected');
-                selectedModel = firstCard.dataset.model;
+            modelGrid.replaceChildren(fragment);
+            
+            selectInitialModel(modelGrid);
+        }
+        
+        function selectInitialModel(modelGrid) {
+            // Keep the user's last choice if it is still available, else select the first model
+            const cards = Array.from(modelGrid.children);
+            const storedModel = readStoredValue('selected_model');
+            const card = cards.find(c => c.dataset.model === storedModel) || cards[0];
+            if (card) {
+                card.classList.add('selected');
+                selectedModel = card.dataset.model;
             }
         }
         
+        function createModelCard(name, icon, description) {
+            // Model names come from the Ollama service, so they are set as text, not parsed as HTML
+            const modelCard = document.createElement('div');
+            modelCard.className = 'model-card';
+            modelCard.dataset.model = name;
+            
+            const iconDiv = document.createElement('div');
+            iconDiv.className = 'model-icon';
+            iconDiv.textContent = icon;
+            
+            const nameDiv = document.createElement('div');
+            nameDiv.className = 'model-name';
+            nameDiv.textContent = name;
+            
+            const descDiv = document.createElement('div');
+            descDiv.className = 'model-desc';
+            descDiv.textContent = description;
+            
+            modelCard.append(iconDiv, nameDiv, descDiv);
+            return modelCard;
+        }
+        
         function getModelIcon(family) {
             const icons = {
                 'gemma': '⚖️',
@@ -1753,18 +1955,53 @@ def create_dynamic_ui():
             return icons[family] || icons.default;
         }
         
-        function formatBytes(bytes) {
-            if (bytes === 0) return '';
-            const k = 1024;
-            const sizes = ['B', 'KB', 'MB', 'GB'];
-            const i = Math.floor(Math.log(bytes) / Math.log(k));
-            return `(${(bytes / Math.pow(k, i)).toFixed(1)}${sizes[i]})`;
+        // Counting semaphore used to cap concurrent Ollama requests
+        class Semaphore {
+            constructor(limit) {
+                this.limit = limit;
+                this.active = 0;
+                this.waiting = [];
+            }
+
+            async acquire() {
+                if (this.active < this.limit) {
+                    this.active++;
+                    return;
+                }
+                // The releasing caller hands its slot straight to the next waiter
+                await new Promise(resolve => this.waiting.push(resolve));
+            }
+
+            release() {
+                const next = this.waiting.shift();
+                if (next) {
+                    next();
+                } else {
+                    this.active--;
+                }
+            }
         }
-        
+
+        function normalizeWhitespace(text) {
+            return text.trim().replace(/\\s+/g, ' ');
+        }
+
         // Agent Framework Implementation
         class AgentFramework {
-            constructor(model) {
+            constructor(model, options = {}) {
                 this.model = model;
+                // A local Ollama slows down for everyone once it is oversubscribed
+                this.maxParallel = options.maxParallel || 2;
+                this.semaphore = new Semaphore(this.maxParallel);
+                // Agent results keyed by agent name + input hash; Map order doubles as LRU order
+                this.resultCache = new Map();
+                this.maxCachedResults = options.maxCachedResults || 500;
+                // Optional (agentName, token) callback for showing generations live
+                this.onToken = options.onToken || null;
+                // Per-agent console logging
+                this.debug = options.debug || false;
+                // Documents shorter than this are translated speculatively, without context
+                this.speculationMaxChars = options.speculationMaxChars || 500;
                 this.agents = new Map();
                 this.dataPipeline = [];
                 this.agentStates = new Map();
@@ -1772,9 +2009,11 @@ def create_dynamic_ui():
             }
 
             initializeAgents() {
-                // Register all agents with their roles and capabilities
+                // Register all agents with their roles and capabilities; each agent
+                // is constructed the first time the pipeline actually runs it
                 this.agents.set('contextAnalyzer', {
-                    agent: new ContextAgent(this.model),
+                    factory: () => new ContextAgent(this.model),
+                    instance: null,
                     role: 'context_analysis',
                     priority: 1,
                     required: true,
@@ -1782,7 +2021,8 @@ def create_dynamic_ui():
                 });
 
                 this.agents.set('translator', {
-                    agent: new TranslationAgent(this.model),
+                    factory: () => new TranslationAgent(this.model),
+                    instance: null,
                     role: 'translation',
                     priority: 2,
                     required: true,
@@ -1790,7 +2030,8 @@ def create_dynamic_ui():
                 });
 
                 this.agents.set('validator', {
-                    agent: new ValidationAgent(this.model),
+                    factory: () => new ValidationAgent(this.model),
+                    instance: null,
                     role: 'validation',
                     priority: 3,
                     required: true,
@@ -1798,7 +2039,8 @@ def create_dynamic_ui():
                 });
 
                 this.agents.set('qualityAssurance', {
-                    agent: new QualityAgent(this.model),
+                    factory: () => new QualityAgent(this.model),
+                    instance: null,
                     role: 'quality_improvement',
                     priority: 4,
                     required: false,
@@ -1806,18 +2048,43 @@ def create_dynamic_ui():
                 });
 
                 this.agents.set('languageConsistencyChecker', {
-                    agent: new LanguageConsistencyAgent(this.model),
+                    factory: () => new LanguageConsistencyAgent(this.model),
+                    instance: null,
                     role: 'language_consistency',
                     priority: 5,
                     required: true,
                     timeout: 20000
                 });
+
+                this.agents.set('quickFix', {
+                    factory: () => new QuickFixAgent(this.model),
+                    instance: null,
+                    role: 'mixed_word_fix',
+                    priority: 6,
+                    required: false,
+                    timeout: 20000
+                });
+
+                // One state record per agent, updated in place on every run
+                this.agents.forEach((agentConfig, agentName) => {
+                    this.agentStates.set(agentName, {
+                        status: 'idle',
+                        startTime: 0,
+                        endTime: 0,
+                        duration: 0,
+                        lastError: null
+                    });
+                });
             }
 
             async executeTranslationPipeline(originalText, sourceLang, targetLang, progressCallback) {
-                console.log('🚀 Starting Agent Framework Pipeline');
+                if (this.debug) console.log('🚀 Starting Agent Framework Pipeline');
+                progressCallback = this.coalesceProgress(progressCallback);
                 this.dataPipeline = [];
-                this.agentStates.clear();
+                this.agentStates.forEach(state => {
+                    state.status = 'idle';
+                    state.lastError = null;
+                });
 
                 const pipelineData = {
                     originalText,
@@ -1836,26 +2103,54 @@ def create_dynamic_ui():
                 };
 
                 try {
-                    // Step 1: Context Analysis
-                    progressCallback('🔍 Agent 1/5: Context Analysis', 1, 'active');
-                    pipelineData.context = await this.executeAgent('contextAnalyzer', {
-                        text: originalText,
-                        sourceLang,
-                        targetLang
-                    });
-                    pipelineData.metadata.agentResults.contextAnalysis = pipelineData.context;
-                    progressCallback('✅ Context Analysis Complete', 1, 'completed');
+                    // Short documents gain little from the context analysis, so they are
+                    // translated without it while the analysis runs, and only re-translated
+                    // with the context if that speculative translation fails validation
+                    const speculate = originalText.length < this.speculationMaxChars;
+
+                    if (speculate) {
+                        // Steps 1 and 2: Context Analysis + speculative Translation
+                        progressCallback('🔍 Agents 1-2/5: Context Analysis + Translation (parallel)', 1, 'active');
+                        progressCallback('🔄 Agents 1-2/5: Context Analysis + Translation (parallel)', 2, 'active');
+                        [pipelineData.context, pipelineData.translatedText] = await Promise.all([
+                            this.executeAgent('contextAnalyzer', {
+                                text: originalText,
+                                sourceLang,
+                                targetLang
+                            }),
+                            this.executeAgent('translator', {
+                                text: originalText,
+                                sourceLang,
+                                targetLang,
+                                context: null
+                            })
+                        ]);
+                        pipelineData.metadata.agentResults.contextAnalysis = pipelineData.context;
+                        pipelineData.metadata.agentResults.translation = pipelineData.translatedText;
+                        progressCallback('✅ Context Analysis Complete', 1, 'completed');
+                        progressCallback('✅ Translation Complete', 2, 'completed');
+                    } else {
+                        // Step 1: Context Analysis
+                        progressCallback('🔍 Agent 1/5: Context Analysis', 1, 'active');
+                        pipelineData.context = await this.executeAgent('contextAnalyzer', {
+                            text: originalText,
+                            sourceLang,
+                            targetLang
+                        });
+                        pipelineData.metadata.agentResults.contextAnalysis = pipelineData.context;
+                        progressCallback('✅ Context Analysis Complete', 1, 'completed');
 
-                    // Step 2: Translation
-                    progressCallback('🔄 Agent 2/5: Translation', 2, 'active');
-                    pipelineData.translatedText = await this.executeAgent('translator', {
-                        text: originalText,
-                        sourceLang,
-                        targetLang,
-                        context: pipelineData.context
-                    });
-                    pipelineData.metadata.agentResults.translation = pipelineData.translatedText;
-                    progressCallback('✅ Translation Complete', 2, 'completed');
+                        // Step 2: Translation
+                        progressCallback('🔄 Agent 2/5: Translation', 2, 'active');
+                        pipelineData.translatedText = await this.executeAgent('translator', {
+                            text: originalText,
+                            sourceLang,
+                            targetLang,
+                            context: pipelineData.context
+                        });
+                        pipelineData.metadata.agentResults.translation = pipelineData.translatedText;
+                        progressCallback('✅ Translation Complete', 2, 'completed');
+                    }
 
                     // Step 3: Validation
                     progressCallback('✅ Agent 3/5: Validation', 3, 'active');
@@ -1868,18 +2163,65 @@ def create_dynamic_ui():
                     pipelineData.metadata.agentResults.validation = pipelineData.validation;
                     progressCallback('✅ Validation Complete', 3, 'completed');
 
-                    // Step 4: Language Consistency Check
-                    progressCallback('🔍 Agent 4/5: Language Consistency', 4, 'active');
-                    pipelineData.consistencyCheck = await this.executeAgent('languageConsistencyChecker', {
-                        text: pipelineData.translatedText,
-                        targetLang,
-                        originalText
-                    });
+                    if (speculate) {
+                        pipelineData.metadata.speculationHit = pipelineData.validation.status === 'valid';
+                        if (!pipelineData.metadata.speculationHit) {
+                            // Redo steps 2 and 3 with the context that has arrived meanwhile
+                            progressCallback('🔄 Agent 2/5: Translation (with context)', 2, 'active');
+                            pipelineData.translatedText = await this.executeAgent('translator', {
+                                text: originalText,
+                                sourceLang,
+                                targetLang,
+                                context: pipelineData.context
+                            });
+                            pipelineData.metadata.agentResults.translation = pipelineData.translatedText;
+                            progressCallback('✅ Translation Complete', 2, 'completed');
+
+                            progressCallback('✅ Agent 3/5: Validation', 3, 'active');
+                            pipelineData.validation = await this.executeAgent('validator', {
+                                originalText,
+                                translatedText: pipelineData.translatedText,
+                                sourceLang,
+                                targetLang
+                            });
+                            pipelineData.metadata.agentResults.validation = pipelineData.validation;
+                            progressCallback('✅ Validation Complete', 3, 'completed');
+                        }
+                    }
+
+                    // Step 4: Language Consistency Check. A translation the validator already
+                    // scores as valid at 95+ skips this call (and therefore step 5).
+                    if (pipelineData.validation.status === 'valid' && pipelineData.validation.score >= 95) {
+                        pipelineData.consistencyCheck = { isConsistent: true, consistencyScore: 100, skipped: true };
+                        progressCallback('✅ Language Consistency Check Skipped (validation score ≥ 95)', 4, 'completed');
+                    } else {
+                        progressCallback('🔍 Agent 4/5: Language Consistency', 4, 'active');
+                        pipelineData.consistencyCheck = await this.executeAgent('languageConsistencyChecker', {
+                            text: pipelineData.translatedText,
+                            targetLang,
+                            originalText
+                        });
+                        progressCallback('✅ Language Consistency Check Complete', 4, 'completed');
+                    }
                     pipelineData.metadata.agentResults.consistencyCheck = pipelineData.consistencyCheck;
-                    progressCallback('✅ Language Consistency Check Complete', 4, 'completed');
 
-                    // Step 5: Quality Improvement (if needed)
-                    if (pipelineData.validation.status === 'needs_revision' || 
+                    // Step 5: Quality Improvement (if needed). A valid translation whose only
+                    // problem is a handful of mixed-language words gets a targeted fix
+                    // instead of the full quality rewrite.
+                    const mixedWords = pipelineData.consistencyCheck.mixedWords || [];
+                    if (pipelineData.validation.status === 'valid' &&
+                        !pipelineData.consistencyCheck.isConsistent &&
+                        mixedWords.length > 0 && mixedWords.length <= 5) {
+
+                        progressCallback('🔧 Agent 5/5: Mixed Word Fix', 5, 'active');
+                        pipelineData.finalText = await this.executeAgent('quickFix', {
+                            translatedText: pipelineData.translatedText,
+                            mixedWords,
+                            targetLang
+                        });
+                        pipelineData.metadata.agentResults.quickFix = pipelineData.finalText;
+                        progressCallback('✅ Mixed Word Fix Complete', 5, 'completed');
+                    } else if (pipelineData.validation.status === 'needs_revision' || 
                         pipelineData.validation.status === 'invalid' ||
                         !pipelineData.consistencyCheck.isConsistent) {
                         
@@ -1894,6 +2236,10 @@ def create_dynamic_ui():
                             consistencyCheck: pipelineData.consistencyCheck
                         });
                         pipelineData.metadata.agentResults.qualityImprovement = pipelineData.finalText;
+                        // An "improvement" that only differs in whitespace needs no revalidation
+                        if (normalizeWhitespace(pipelineData.finalText) === normalizeWhitespace(pipelineData.translatedText)) {
+                            pipelineData.finalText = pipelineData.translatedText;
+                        }
                         progressCallback('✅ Quality Improvement Complete', 5, 'completed');
                     } else {
                         pipelineData.finalText = pipelineData.translatedText;
@@ -1916,7 +2262,7 @@ def create_dynamic_ui():
                     pipelineData.metadata.endTime = Date.now();
                     pipelineData.metadata.duration = pipelineData.metadata.endTime - pipelineData.metadata.startTime;
 
-                    console.log('🎯 Agent Framework Pipeline Complete:', pipelineData.metadata);
+                    if (this.debug) console.log('🎯 Agent Framework Pipeline Complete:', pipelineData.metadata);
                     return pipelineData.finalText || pipelineData.translatedText;
 
                 } catch (error) {
@@ -1932,96 +2278,178 @@ def create_dynamic_ui():
                     throw new Error(`Agent ${agentName} not found`);
                 }
 
-                console.log(`🤖 Executing Agent: ${agentName}`, inputData);
+                // Identical inputs (re-runs, repeated regions) reuse the earlier result
+                const cacheKey = await this.getCacheKey(agentName, inputData);
+                if (this.resultCache.has(cacheKey)) {
+                    const cachedResult = this.resultCache.get(cacheKey);
+                    this.resultCache.delete(cacheKey);
+                    this.resultCache.set(cacheKey, cachedResult);
+                    if (this.debug) console.log(`♻️ Agent ${agentName} served from cache`);
+                    return cachedResult;
+                }
+
+                if (!agentConfig.instance) {
+                    agentConfig.instance = agentConfig.factory();
+                    if (this.onToken) {
+                        agentConfig.instance.onToken = (token) => this.onToken(agentName, token);
+                    }
+                }
+                const agent = agentConfig.instance;
+
+                if (this.debug) console.log(`🤖 Executing Agent: ${agentName}`);
                 
+                const state = this.agentStates.get(agentName);
                 const startTime = Date.now();
-                this.agentStates.set(agentName, {
-                    status: 'running',
-                    startTime,
-                    inputData
-                });
+                state.status = 'running';
+                state.startTime = startTime;
 
                 try {
                     let result;
-                    
-                    switch (agentName) {
-                        case 'contextAnalyzer':
-                            result = await agentConfig.agent.analyzeContext(
-                                inputData.text, 
-                                inputData.sourceLang, 
-                                inputData.targetLang
-                            );
-                            break;
-                            
-                        case 'translator':
-                            result = await agentConfig.agent.translate(
-                                inputData.text, 
-                                inputData.sourceLang, 
-                                inputData.targetLang, 
-                                inputData.context
-                            );
-                            break;
-                            
-                        case 'validator':
-                            result = await agentConfig.agent.validateTranslation(
-                                inputData.originalText, 
-                                inputData.translatedText, 
-                                inputData.sourceLang, 
-                                inputData.targetLang
-                            );
-                            break;
-                            
-                        case 'qualityAssurance':
-                            result = await agentConfig.agent.improveTranslation(
-                                inputData.originalText, 
-                                inputData.translatedText, 
-                                inputData.sourceLang, 
-                                inputData.targetLang, 
-                                inputData.context
-                            );
-                            break;
-                            
-                        case 'languageConsistencyChecker':
-                            result = await agentConfig.agent.checkConsistency(
-                                inputData.text, 
-                                inputData.targetLang, 
-                                inputData.originalText
-                            );
-                            break;
-                            
-                        default:
-                            throw new Error(`Unknown agent: ${agentName}`);
+                    await this.semaphore.acquire();
+                    try {
+                        result = await this.withTimeout(
+                            signal => this.invokeAgent(agent, agentName, inputData, signal),
+                            agentConfig.timeout,
+                            agentName
+                        );
+                    } finally {
+                        this.semaphore.release();
                     }
 
                     const endTime = Date.now();
-                    this.agentStates.set(agentName, {
-                        status: 'completed',
-                        startTime,
-                        endTime,
-                        duration: endTime - startTime,
-                        inputData,
-                        result
-                    });
-
-                    console.log(`✅ Agent ${agentName} completed in ${endTime - startTime}ms`);
+                    state.status = 'completed';
+                    state.endTime = endTime;
+                    state.duration = endTime - startTime;
+
+                    if (this.debug) console.log(`✅ Agent ${agentName} completed in ${endTime - startTime}ms`);
+                    // Stand-in verdicts for unparseable replies are retried next time, not replayed
+                    if (!(result && result.fallback)) {
+                        this.cacheResult(cacheKey, result);
+                    }
                     return result;
 
                 } catch (error) {
                     const endTime = Date.now();
-                    this.agentStates.set(agentName, {
-                        status: 'error',
-                        startTime,
-                        endTime,
-                        duration: endTime - startTime,
-                        inputData,
-                        error: error.message
-                    });
+                    state.status = 'error';
+                    state.endTime = endTime;
+                    state.duration = endTime - startTime;
+                    state.lastError = error.message;
 
                     console.error(`❌ Agent ${agentName} failed:`, error);
                     throw error;
                 }
             }
 
+            coalesceProgress(progressCallback) {
+                // Keep only the latest update per step and deliver them once per frame,
+                // so back-to-back active/completed updates cost a single DOM pass
+                const pending = new Map();
+                let frame = null;
+                const flush = () => {
+                    frame = null;
+                    pending.forEach(([message, state], step) => progressCallback(message, step, state));
+                    pending.clear();
+                };
+                return (message, step, state) => {
+                    pending.set(step, [message, state]);
+                    if (frame === null) {
+                        frame = requestAnimationFrame(flush);
+                    }
+                };
+            }
+
+            async getCacheKey(agentName, inputData) {
+                const payload = JSON.stringify(inputData);
+                // crypto.subtle only exists in secure contexts (https or localhost)
+                if (!(window.crypto && window.crypto.subtle)) {
+                    return `${agentName}|${payload}`;
+                }
+                const digest = await window.crypto.subtle.digest('SHA-256', new TextEncoder().encode(payload));
+                const hex = Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+                return `${agentName}|${hex}`;
+            }
+
+            cacheResult(cacheKey, result) {
+                this.resultCache.set(cacheKey, result);
+                if (this.resultCache.size > this.maxCachedResults) {
+                    // Evict the least recently used entry
+                    this.resultCache.delete(this.resultCache.keys().next().value);
+                }
+            }
+
+            invokeAgent(agent, agentName, inputData, signal) {
+                switch (agentName) {
+                    case 'contextAnalyzer':
+                        return agent.analyzeContext(
+                            inputData.text, 
+                            inputData.sourceLang, 
+                            inputData.targetLang,
+                            signal
+                        );
+                        
+                    case 'translator':
+                        return agent.translate(
+                            inputData.text, 
+                            inputData.sourceLang, 
+                            inputData.targetLang, 
+                            inputData.context,
+                            signal
+                        );
+                        
+                    case 'validator':
+                        return agent.validateTranslation(
+                            inputData.originalText, 
+                            inputData.translatedText, 
+                            inputData.sourceLang, 
+                            inputData.targetLang,
+                            signal
+                        );
+                        
+                    case 'qualityAssurance':
+                        return agent.improveTranslation(
+                            inputData.originalText, 
+                            inputData.translatedText, 
+                            inputData.sourceLang, 
+                            inputData.targetLang, 
+                            inputData.context,
+                            signal
+                        );
+                        
+                    case 'languageConsistencyChecker':
+                        return agent.checkConsistency(
+                            inputData.text, 
+                            inputData.targetLang, 
+                            inputData.originalText,
+                            signal
+                        );
+                        
+                    case 'quickFix':
+                        return agent.fixMixedWords(
+                            inputData.translatedText, 
+                            inputData.mixedWords, 
+                            inputData.targetLang,
+                            signal
+                        );
+                        
+                    default:
+                        throw new Error(`Unknown agent: ${agentName}`);
+                }
+            }
+
+            withTimeout(run, ms, agentName) {
+                // Enforce the per-agent timeout declared at registration. The Ollama
+                // request is aborted on timeout, so it stops before its semaphore slot is freed.
+                const controller = new AbortController();
+                let timer;
+                const timeout = new Promise((_, reject) => {
+                    timer = setTimeout(() => {
+                        controller.abort();
+                        reject(new Error(`Agent ${agentName} timed out after ${ms}ms`));
+                    }, ms);
+                });
+                return Promise.race([run(controller.signal), timeout]).finally(() => clearTimeout(timer));
+            }
+
             getAgentStates() {
                 return this.agentStates;
             }
@@ -2032,12 +2460,93 @@ def create_dynamic_ui():
         }
 
         // Individual Agent Classes
-        class ContextAgent {
-            constructor(model) {
+        // Language names used in agent prompts, shared by every agent
+        const LANG_NAMES = Object.freeze({
+            'en': 'English', 'te': 'Telugu', 'kn': 'Kannada', 'ta': 'Tamil',
+            'hi': 'Hindi', 'bn': 'Bengali', 'gu': 'Gujarati', 'pa': 'Punjabi',
+            'mr': 'Marathi', 'or': 'Odia', 'as': 'Assamese', 'ne': 'Nepali',
+            'ur': 'Urdu', 'ml': 'Malayalam', 'si': 'Sinhala', 'my': 'Burmese',
+            'th': 'Thai', 'km': 'Khmer', 'lo': 'Lao', 'vi': 'Vietnamese',
+            'es': 'Spanish', 'fr': 'French', 'de': 'German', 'ja': 'Japanese',
+            'ko': 'Korean', 'zh': 'Chinese'
+        });
+
+        // Shared Ollama access for all agents
+        class BaseAgent {
+            constructor(model, name) {
                 this.model = model;
+                this.name = name;
+                // Optional callback receiving each generated token
+                this.onToken = null;
             }
 
-            async analyzeContext(text, sourceLang, targetLang) {
+            getLanguageName(langCode) {
+                return LANG_NAMES[langCode] || langCode;
+            }
+
+            // Stream the generation as NDJSON, passing each token to onToken as it arrives.
+            // format: 'json' constrains the output to a JSON value; options are Ollama
+            // model options such as num_predict; signal aborts the request.
+            async callOllama(prompt, { format, options, signal } = {}) {
+                const response = await fetch('/api/ollama', {
+                    method: 'POST',
+                    signal: signal,
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({
+                        model: this.model,
+                        prompt: prompt,
+                        stream: true,
+                        format: format,
+                        options: options
+                    })
+                });
+                
+                if (!response.ok) throw new Error(`${this.name} error: ${response.status}`);
+                
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                const parts = [];
+                let pending = '';
+                
+                const handleLine = (line) => {
+                    if (!line.trim()) return;
+                    const chunk = JSON.parse(line);
+                    if (chunk.error) throw new Error(`${this.name} error: ${chunk.error}`);
+                    parts.push(chunk.response);
+                    if (this.onToken) this.onToken(chunk.response);
+                };
+                
+                while (true) {
+                    const { done, value } = await reader.read();
+                    if (done) break;
+                    pending += decoder.decode(value, { stream: true });
+                    const lines = pending.split('\\n');
+                    pending = lines.pop();
+                    lines.forEach(handleLine);
+                }
+                handleLine(pending + decoder.decode());
+                
+                return parts.join('').trim();
+            }
+
+            // Models often wrap JSON in prose, so parse the outermost {...} block
+            parseJsonBlock(text) {
+                const match = text.match(/\\{[\\s\\S]*\\}/);
+                if (!match) return null;
+                try {
+                    return JSON.parse(match[0]);
+                } catch (error) {
+                    return null;
+                }
+            }
+        }
+
+        class ContextAgent extends BaseAgent {
+            constructor(model) {
+                super(model, 'Context agent');
+            }
+
+            async analyzeContext(text, sourceLang, targetLang, signal) {
                 const targetLanguageName = this.getLanguageName(targetLang);
                 
                 const prompt = `You are a Legal Context Specialist. Analyze this document and identify:
@@ -2051,52 +2560,31 @@ def create_dynamic_ui():
 Document to analyze:
 ${text}
 
-Respond with structured analysis for ${targetLanguageName} translation:`;
+This analysis guides a ${targetLanguageName} translation. Respond with at most 5 short bullet lines: doc_type, jurisdiction, domain, formality, key_terms (comma-separated).`;
 
-                return await this.callOllama(prompt);
-            }
-
-            getLanguageName(langCode) {
-                const names = {
-                    'en': 'English', 'te': 'Telugu', 'kn': 'Kannada', 'ta': 'Tamil',
-                    'hi': 'Hindi', 'bn': 'Bengali', 'gu': 'Gujarati', 'pa': 'Punjabi',
-                    'mr': 'Marathi', 'or': 'Odia', 'as': 'Assamese', 'ne': 'Nepali',
-                    'ur': 'Urdu', 'ml': 'Malayalam', 'si': 'Sinhala', 'my': 'Burmese',
-                    'th': 'Thai', 'km': 'Khmer', 'lo': 'Lao', 'vi': 'Vietnamese',
-                    'es': 'Spanish', 'fr': 'French', 'de': 'German', 'ja': 'Japanese',
-                    'ko': 'Korean', 'zh': 'Chinese'
-                };
-                return names[langCode] || langCode;
-            }
-
-            async callOllama(prompt) {
-                const response = await fetch('/api/ollama', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        model: this.model,
-                        prompt: prompt
-                    })
-                });
-                
-                if (!response.ok) throw new Error(`Context agent error: ${response.status}`);
-                const data = await response.json();
-                return data.response.trim();
+                const analysis = await this.callOllama(prompt, { options: { num_predict: 200 }, signal });
+                // Downstream prompts only carry the compact summary, keeping their token count down
+                const summary = analysis.split('\\n')
+                    .map(line => line.trim())
+                    .filter(Boolean)
+                    .slice(0, 5)
+                    .join('\\n');
+                return { analysis, summary };
             }
         }
 
-        class TranslationAgent {
+        class TranslationAgent extends BaseAgent {
             constructor(model) {
-                this.model = model;
+                super(model, 'Translation agent');
             }
 
-            async translate(text, sourceLang, targetLang, context) {
+            async translate(text, sourceLang, targetLang, context, signal) {
                 const targetLanguageName = this.getLanguageName(targetLang);
                 
                 const prompt = `You are a Legal Translation Precision Engine. Translate this document to ${targetLanguageName} with STRICT LEGAL PRECISION:
 
 CONTEXT ANALYSIS:
-${context}
+${context ? context.summary : 'Not available'}
 
 TRANSLATION RULES:
 1. Preserve EXACT sentence structure and dependent clauses
@@ -2110,44 +2598,16 @@ ${text}
 
 Provide precise legal translation:`;
 
-                return await this.callOllama(prompt);
-            }
-
-            getLanguageName(langCode) {
-                const names = {
-                    'en': 'English', 'te': 'Telugu', 'kn': 'Kannada', 'ta': 'Tamil',
-                    'hi': 'Hindi', 'bn': 'Bengali', 'gu': 'Gujarati', 'pa': 'Punjabi',
-                    'mr': 'Marathi', 'or': 'Odia', 'as': 'Assamese', 'ne': 'Nepali',
-                    'ur': 'Urdu', 'ml': 'Malayalam', 'si': 'Sinhala', 'my': 'Burmese',
-                    'th': 'Thai', 'km': 'Khmer', 'lo': 'Lao', 'vi': 'Vietnamese',
-                    'es': 'Spanish', 'fr': 'French', 'de': 'German', 'ja': 'Japanese',
-                    'ko': 'Korean', 'zh': 'Chinese'
-                };
-                return names[langCode] || langCode;
-            }
-
-            async callOllama(prompt) {
-                const response = await fetch('/api/ollama', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        model: this.model,
-                        prompt: prompt
-                    })
-                });
-                
-                if (!response.ok) throw new Error(`Translation agent error: ${response.status}`);
-                const data = await response.json();
-                return data.response.trim();
+                return await this.callOllama(prompt, { signal });
             }
         }
 
-        class ValidationAgent {
+        class ValidationAgent extends BaseAgent {
             constructor(model) {
-                this.model = model;
+                super(model, 'Validation agent');
             }
 
-            async validateTranslation(originalText, translatedText, sourceLang, targetLang) {
+            async validateTranslation(originalText, translatedText, sourceLang, targetLang, signal) {
                 const targetLanguageName = this.getLanguageName(targetLang);
                 
                 const prompt = `You are a Legal Validation Specialist. Perform legal review:
@@ -2165,7 +2625,7 @@ FINAL VALIDATION CHECKLIST:
 4. COMPLETENESS: Is no legal content lost or altered?
 5. FORMALITY: Is appropriate legal tone maintained?
 
-Respond with JSON:
+Respond ONLY with a JSON object, no prose:
 {
     "status": "valid/invalid/needs_revision",
     "score": 0-100,
@@ -2173,55 +2633,28 @@ Respond with JSON:
     "recommendations": ["rec1", "rec2"]
 }`;
 
-                const result = await this.callOllama(prompt);
+                const result = await this.callOllama(prompt, { format: 'json', signal });
+                const validation = this.parseJsonBlock(result);
                 
-                try {
-                    return JSON.parse(result);
-                } catch (error) {
-                    return {
-                        status: 'needs_revision',
-                        score: 50,
-                        issues: ['JSON parsing failed'],
-                        recommendations: ['Manual review required']
-                    };
+                if (validation) {
+                    return validation;
                 }
-            }
-
-            getLanguageName(langCode) {
-                const names = {
-                    'en': 'English', 'te': 'Telugu', 'kn': 'Kannada', 'ta': 'Tamil',
-                    'hi': 'Hindi', 'bn': 'Bengali', 'gu': 'Gujarati', 'pa': 'Punjabi',
-                    'mr': 'Marathi', 'or': 'Odia', 'as': 'Assamese', 'ne': 'Nepali',
-                    'ur': 'Urdu', 'ml': 'Malayalam', 'si': 'Sinhala', 'my': 'Burmese',
-                    'th': 'Thai', 'km': 'Khmer', 'lo': 'Lao', 'vi': 'Vietnamese',
-                    'es': 'Spanish', 'fr': 'French', 'de': 'German', 'ja': 'Japanese',
-                    'ko': 'Korean', 'zh': 'Chinese'
+                return {
+                    status: 'needs_revision',
+                    score: 50,
+                    issues: ['JSON parsing failed'],
+                    recommendations: ['Manual review required'],
+                    fallback: true
                 };
-                return names[langCode] || langCode;
-            }
-
-            async callOllama(prompt) {
-                const response = await fetch('/api/ollama', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        model: this.model,
-                        prompt: prompt
-                    })
-                });
-                
-                if (!response.ok) throw new Error(`Validation agent error: ${response.status}`);
-                const data = await response.json();
-                return data.response.trim();
             }
         }
 
-        class QualityAgent {
+        class QualityAgent extends BaseAgent {
             constructor(model) {
-                this.model = model;
+                super(model, 'Quality agent');
             }
 
-            async improveTranslation(originalText, translatedText, sourceLang, targetLang, context) {
+            async improveTranslation(originalText, translatedText, sourceLang, targetLang, context, signal) {
                 const targetLanguageName = this.getLanguageName(targetLang);
                 
                 const prompt = `You are a Legal Quality Assurance Specialist. Improve this translation:
@@ -2233,49 +2666,21 @@ CURRENT TRANSLATION:
 ${translatedText}
 
 CONTEXT:
-${context}
-
-Provide improved translation maintaining legal precision:`;
-
-                return await this.callOllama(prompt);
-            }
+${context.summary}
 
-            getLanguageName(langCode) {
-                const names = {
-                    'en': 'English', 'te': 'Telugu', 'kn': 'Kannada', 'ta': 'Tamil',
-                    'hi': 'Hindi', 'bn': 'Bengali', 'gu': 'Gujarati', 'pa': 'Punjabi',
-                    'mr': 'Marathi', 'or': 'Odia', 'as': 'Assamese', 'ne': 'Nepali',
-                    'ur': 'Urdu', 'ml': 'Malayalam', 'si': 'Sinhala', 'my': 'Burmese',
-                    'th': 'Thai', 'km': 'Khmer', 'lo': 'Lao', 'vi': 'Vietnamese',
-                    'es': 'Spanish', 'fr': 'French', 'de': 'German', 'ja': 'Japanese',
-                    'ko': 'Korean', 'zh': 'Chinese'
-                };
-                return names[langCode] || langCode;
-            }
+Provide improved translation maintaining legal precision:`;
 
-            async callOllama(prompt) {
-                const response = await fetch('/api/ollama', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        model: this.model,
-                        prompt: prompt
-                    })
-                });
-                
-                if (!response.ok) throw new Error(`Quality agent error: ${response.status}`);
-                const data = await response.json();
-                return data.response.trim();
+                return await this.callOllama(prompt, { signal });
             }
         }
 
         // Enhanced Language Consistency Agent
-        class LanguageConsistencyAgent {
+        class LanguageConsistencyAgent extends BaseAgent {
             constructor(model) {
-                this.model = model;
+                super(model, 'Language consistency agent');
             }
 
-            async checkConsistency(text, targetLang, originalText) {
+            async checkConsistency(text, targetLang, originalText, signal) {
                 const targetLanguageName = this.getLanguageName(targetLang);
                 
                 const prompt = `You are a language consistency expert. Analyze the following text for language mixing.
@@ -2292,7 +2697,7 @@ CRITICAL ANALYSIS REQUIRED:
 3. Look for mixed language patterns
 4. Verify consistency in terminology
 
-Respond with a JSON object:
+Respond ONLY with a JSON object, no prose:
 {
     "isConsistent": true/false,
     "mixedWords": ["word1", "word2"],
@@ -2301,10 +2706,10 @@ Respond with a JSON object:
     "recommendations": ["recommendation1", "recommendation2"]
 }`;
 
-                const result = await this.callOllama(prompt);
+                const result = await this.callOllama(prompt, { format: 'json', signal });
+                const analysis = this.parseJsonBlock(result);
                 
-                try {
-                    const analysis = JSON.parse(result);
+                if (analysis) {
                     return {
                         isConsistent: analysis.isConsistent,
                         mixedWords: analysis.mixedWords || [],
@@ -2313,45 +2718,39 @@ Respond with a JSON object:
                         recommendations: analysis.recommendations || [],
                         targetLanguage: targetLanguageName
                     };
-                } catch (error) {
-                    // Fallback parsing
-                    return {
-                        isConsistent: !result.toLowerCase().includes('inconsistent'),
-                        mixedWords: [],
-                        mixedLanguages: [],
-                        consistencyScore: 50,
-                        recommendations: ['Manual review recommended'],
-                        targetLanguage: targetLanguageName
-                    };
                 }
-            }
-
-            getLanguageName(langCode) {
-                const names = {
-                    'en': 'English', 'te': 'Telugu', 'kn': 'Kannada', 'ta': 'Tamil',
-                    'hi': 'Hindi', 'bn': 'Bengali', 'gu': 'Gujarati', 'pa': 'Punjabi',
-                    'mr': 'Marathi', 'or': 'Odia', 'as': 'Assamese', 'ne': 'Nepali',
-                    'ur': 'Urdu', 'ml': 'Malayalam', 'si': 'Sinhala', 'my': 'Burmese',
-                    'th': 'Thai', 'km': 'Khmer', 'lo': 'Lao', 'vi': 'Vietnamese',
-                    'es': 'Spanish', 'fr': 'French', 'de': 'German', 'ja': 'Japanese',
-                    'ko': 'Korean', 'zh': 'Chinese'
+                // Fallback parsing
+                return {
+                    isConsistent: !result.toLowerCase().includes('inconsistent'),
+                    mixedWords: [],
+                    mixedLanguages: [],
+                    consistencyScore: 50,
+                    recommendations: ['Manual review recommended'],
+                    targetLanguage: targetLanguageName,
+                    fallback: true
                 };
-                return names[langCode] || langCode;
+            }
+        }
+        
+        // Replaces a few mixed-language words without re-translating the whole text
+        class QuickFixAgent extends BaseAgent {
+            constructor(model) {
+                super(model, 'Quick fix agent');
             }
 
-            async callOllama(prompt) {
-                const response = await fetch('/api/ollama', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        model: this.model,
-                        prompt: prompt
-                    })
-                });
+            async fixMixedWords(translatedText, mixedWords, targetLang, signal) {
+                const targetLanguageName = this.getLanguageName(targetLang);
                 
-                if (!response.ok) throw new Error(`Language consistency agent error: ${response.status}`);
-                const data = await response.json();
-                return data.response.trim();
+                const prompt = `Replace these words that are not in ${targetLanguageName} with their correct ${targetLanguageName} equivalents: ${mixedWords.join(', ')}
+
+Change nothing else in the text.
+
+Text:
+${translatedText}
+
+Return only the corrected text:`;
+
+                return await this.callOllama(prompt, { signal });
             }
         }
         
@@ -2383,6 +2782,23 @@ Respond with a JSON object:
             }
         });
         
+        // One delegated listener serves every bounding box overlay
+        document.getElementById('imageContainer').addEventListener('click', (e) => {
+            const overlay = e.target.closest('.bbox-overlay');
+            if (overlay) {
+                selectRegion(Number(overlay.dataset.regionId));
+            }
+        });
+        
+        // One delegated listener serves the action buttons of every text region
+        document.getElementById('textRegions').addEventListener('click', (e) => {
+            const button = e.target.closest('.control-btn');
+            if (button) {
+                const regionId = Number(button.closest('.text-region').dataset.regionId);
+                setRegionAction(regionId, button.dataset.action);
+            }
+        });
+        
         function handleFileUpload(file) {
             if (!file.type.startsWith('image/')) {
                 showStatus('Please upload an image file.', 'error');
@@ -2406,13 +2822,9 @@ Respond with a JSON object:
             .then(data => {
                 hideLoading();
                 if (data.success) {
-                    showProcessingStep(2);
-                    setTimeout(() => {
-                        showProcessingStep(3);
-                        setTimeout(() => {
-                            displayResults(data);
-                        }, 1000);
-                    }, 2000);
+                    // OCR and translation are already done server-side; displayResults
+                    // replaces the step indicator straight away
+                    displayResults(data);
                 } else {
                     showStatus('Error: ' + data.error, 'error');
                     if (data.suggestions) {
@@ -2437,7 +2849,13 @@ Respond with a JSON object:
             
             // Store data
             textRegions = data.text_regions;
-            userActions = {};
+            userActions = new Uint8Array(textRegions.length);
+            regionNodes.clear();
+            selectedRegionId = null;
+            // The server dropped its actions for the previous document
+            dirtyRegions.clear();
+            actionsVersion = null;
+            setLastProcessed(null);
             
             // Create bounding box overlays
             createBoundingBoxes(data.text_regions);
@@ -2461,30 +2879,40 @@ Respond with a JSON object:
                 const scaleX = imgRect.width / img.naturalWidth;
                 const scaleY = imgRect.height / img.naturalHeight;
                 
-                regions.forEach(region => {
-                    const overlay = document.createElement('div');
-                    overlay.className = 'bbox-overlay preserve';
-                    overlay.style.left = (region.bbox.x * scaleX) + 'px';
-                    overlay.style.top = (region.bbox.y * scaleY) + 'px';
-                    overlay.style.width = (region.bbox.width * scaleX) + 'px';
-                    overlay.style.height = (region.bbox.height * scaleY) + 'px';
-                    overlay.dataset.regionId = region.id;
-                    
-                    overlay.addEventListener('click', () => {
-                        selectRegion(region.id);
-                    });
-                    
-                    container.appendChild(overlay);
-                });
+                // Build every overlay as one HTML string so they are parsed and inserted
+                // in a single pass; positioning by transform avoids a layout per left/top write
+                const overlaysHtml = regions.map(region => `<div class="bbox-overlay preserve" data-region-id="${region.id}" ` +
+                    `style="transform: translate3d(${region.bbox.x * scaleX}px, ${region.bbox.y * scaleY}px, 0); ` +
+                    `width: ${region.bbox.width * scaleX}px; height: ${region.bbox.height * scaleY}px;"></div>`).join('');
+                container.insertAdjacentHTML('beforeend', overlaysHtml);
+                
+                for (const overlay of container.getElementsByClassName('bbox-overlay')) {
+                    getRegionNodes(Number(overlay.dataset.regionId)).overlay = overlay;
+                }
             };
         }
         
+        function getRegionNodes(regionId) {
+            let nodes = regionNodes.get(regionId);
+            if (!nodes) {
+                nodes = { overlay: null, textRegion: null, buttons: [] };
+                regionNodes.set(regionId, nodes);
+            }
+            return nodes;
+        }
+        
         function selectRegion(regionId) {
             // Highlight the region
-            document.querySelectorAll('.text-region').forEach(region => {
-                region.classList.remove('selected');
-            });
-            document.querySelector(`[data-region-id="${regionId}"]`).parentElement.querySelector('.text-region').classList.add('selected');
+            const previous = regionNodes.get(selectedRegionId);
+            if (previous && previous.textRegion) {
+                previous.textRegion.classList.remove('selected');
+            }
+            // The region card may still be waiting for an idle slice
+            const nodes = getRegionNodes(regionId);
+            if (nodes.textRegion) {
+                nodes.textRegion.classList.add('selected');
+            }
+            selectedRegionId = regionId;
         }
         
         function showProcessingStep(stepNumber) {
@@ -2507,78 +2935,197 @@ Respond with a JSON object:
             }
         }
         
-        function renderTextRegions() {
-            const container = document.getElementById('textRegions');
-            container.innerHTML = '';
-            
-            textRegions.forEach(region => {
-                const regionDiv = document.createElement('div');
-                regionDiv.className = `text-region preserve`;
-                regionDiv.innerHTML = `
+        const HTML_ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' };
+        
+        function escapeHtml(text) {
+            return String(text).replace(/[&<>"']/g, ch => HTML_ESCAPES[ch]);
+        }
+        
+        // Regions rendered per slice; later slices wait for idle time so that
+        // documents with many regions do not block the first paint
+        const REGION_RENDER_CHUNK = 100;
+        const scheduleIdle = window.requestIdleCallback ||
+            (callback => setTimeout(() => {
+                // Without requestIdleCallback, give each slice a ~16ms frame budget
+                const start = performance.now();
+                callback({ timeRemaining: () => Math.max(0, 16 - (performance.now() - start)) });
+            }, 1));
+        
+        function renderRegionHtml(region) {
+            return `
+                <div class="text-region preserve" data-region-id="${region.id}">
                     <div class="region-header">
                         <div class="region-title">Text Region ${region.id + 1}</div>
                         <div class="region-controls">
-                            <button class="control-btn ${userActions[region.id] === 'translate' ? 'active' : ''}" 
-                                    onclick="setRegionAction(${region.id}, 'translate')">Translate</button>
-                            <button class="control-btn ${userActions[region.id] === 'preserve' ? 'active' : ''}" 
-                                    onclick="setRegionAction(${region.id}, 'preserve')">Preserve</button>
-                            <button class="control-btn ${userActions[region.id] === 'whiteout' ? 'active' : ''}" 
-                                    onclick="setRegionAction(${region.id}, 'whiteout')">Whiteout</button>
+                            <button class="control-btn ${REGION_ACTIONS[userActions[region.id]] === 'translate' ? 'active' : ''}" 
+                                    data-action="translate">Translate</button>
+                            <button class="control-btn ${REGION_ACTIONS[userActions[region.id]] === 'preserve' ? 'active' : ''}" 
+                                    data-action="preserve">Preserve</button>
+                            <button class="control-btn ${REGION_ACTIONS[userActions[region.id]] === 'whiteout' ? 'active' : ''}" 
+                                    data-action="whiteout">Whiteout</button>
                         </div>
                     </div>
                     <div class="region-text">
-                        <strong>Original:</strong> ${region.text}<br>
-                        <strong>Translated:</strong> ${region.translated}
+                        <strong>Original:</strong> ${escapeHtml(region.text)}<br>
+                        <strong>Translated:</strong> ${escapeHtml(region.translated)}
                     </div>
-                `;
-                container.appendChild(regionDiv);
-            });
+                </div>
+            `;
+        }
+        
+        function renderTextRegions() {
+            const container = document.getElementById('textRegions');
+            const regions = textRegions;
+            let index = 0;
+            container.innerHTML = '';
+            
+            const renderChunk = (deadline) => {
+                // A newer document has replaced this one
+                if (regions !== textRegions) return;
+                
+                const firstNew = container.children.length;
+                do {
+                    // Each slice is built as one string so it is parsed and laid out once
+                    const chunk = regions.slice(index, index + REGION_RENDER_CHUNK);
+                    container.insertAdjacentHTML('beforeend', chunk.map(renderRegionHtml).join(''));
+                    index += chunk.length;
+                } while (index < regions.length && deadline.timeRemaining() > 1);
+                
+                const children = container.children;
+                for (let i = firstNew; i < children.length; i++) {
+                    const nodes = getRegionNodes(Number(children[i].dataset.regionId));
+                    nodes.textRegion = children[i];
+                    nodes.buttons = Array.from(children[i].getElementsByClassName('control-btn'));
+                }
+                
+                if (index < regions.length) {
+                    scheduleIdle(renderChunk);
+                }
+            };
+            
+            // The first slice renders straight away
+            renderChunk({ timeRemaining: () => 0 });
         }
         
         function setRegionAction(regionId, action) {
-            userActions[regionId] = action;
+            const code = REGION_ACTIONS.indexOf(action);
+            if (userActions[regionId] === code) return;
+            userActions[regionId] = code;
+            dirtyRegions.add(regionId);
+            actionsEditVersion++;
+            
+            const nodes = getRegionNodes(regionId);
             
             // Update region styling
-            const regionDiv = document.querySelector(`[data-region-id="${regionId}"]`);
-            if (regionDiv) {
-                regionDiv.className = `bbox-overlay ${action}`;
+            if (nodes.overlay) {
+                nodes.overlay.className = `bbox-overlay ${action}`;
             }
             
             // Update control buttons
-            const regionElement = document.querySelector(`[data-region-id="${regionId}"]`).parentElement.querySelector('.text-region');
-            regionElement.className = `text-region ${action}`;
+            nodes.textRegion.className = `text-region ${action}`;
             
             // Update control buttons
-            const buttons = regionElement.querySelectorAll('.control-btn');
-            buttons.forEach(btn => btn.classList.remove('active'));
-            buttons.forEach(btn => {
-                if (btn.textContent.toLowerCase() === action) {
-                    btn.classList.add('active');
+            nodes.buttons.forEach(btn => {
+                btn.classList.toggle('active', btn.dataset.action === action);
+            });
+        }
+        
+        // Only one /process request is outstanding at a time; repeated clicks are ignored
+        let processRequestInFlight = false;
+        // Regions changed since the server last acknowledged our actions, and the
+        // server's version of them; null means the next request sends the full map
+        const dirtyRegions = new Set();
+        let actionsVersion = null;
+        // Bumped on every action change, so unchanged actions are detected in O(1)
+        let actionsEditVersion = 0;
+        // Last processed document, reused while the region actions are unchanged
+        let lastProcessed = null;
+        
+        function processDocument() {
+            const editVersion = actionsEditVersion;
+            if (lastProcessed && lastProcessed.editVersion === editVersion) {
+                return Promise.resolve(lastProcessed.data);
+            }
+            return postActions().then(data => {
+                if (data.success) {
+                    data.url = URL.createObjectURL(data.blob);
+                    setLastProcessed({ editVersion, data });
                 }
+                return data;
             });
         }
         
-        function previewDocument() {
-            showLoading('Generating HTML Preview', 'Creating layout-preserving document...');
+        function setLastProcessed(processed) {
+            if (lastProcessed) {
+                URL.revokeObjectURL(lastProcessed.data.url);
+            }
+            lastProcessed = processed;
+        }
+        
+        function postActions() {
+            const sentActions = userActions.slice();
+            let payload;
+            if (actionsVersion === null) {
+                // Full map: one byte per region, base64 encoded
+                let binary = '';
+                for (let i = 0; i < sentActions.length; i++) {
+                    binary += String.fromCharCode(sentActions[i]);
+                }
+                payload = { action_codes: btoa(binary), action_names: REGION_ACTIONS };
+            } else {
+                const delta = {};
+                dirtyRegions.forEach(regionId => {
+                    delta[regionId] = REGION_ACTIONS[sentActions[regionId]];
+                });
+                payload = { actions: delta, base_version: actionsVersion };
+            }
+            const body = JSON.stringify(payload);
             
-            fetch('/process', {
+            return fetch('/process', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify({ actions: userActions })
+                body: body,
+                // Let the request complete even if the page navigates away mid-download;
+                // browsers reject keepalive requests with bodies over 64 KB
+                keepalive: body.length < 60000
             })
-            .then(response => response.json())
+            .then(response => {
+                if (response.status === 409 && actionsVersion !== null) {
+                    // The server lost track of our actions; resend the full map
+                    actionsVersion = null;
+                    return postActions();
+                }
+                if (!response.ok) {
+                    return response.json();
+                }
+                // Regions changed again while the request was in flight stay dirty
+                dirtyRegions.forEach(regionId => {
+                    if (userActions[regionId] === sentActions[regionId]) {
+                        dirtyRegions.delete(regionId);
+                    }
+                });
+                actionsVersion = Number(response.headers.get('X-Actions-Version'));
+                // The processed document arrives as raw HTML and goes straight into a Blob
+                return response.blob().then(blob => ({ success: true, blob }));
+            });
+        }
+        
+        function previewDocument() {
+            if (processRequestInFlight) return;
+            processRequestInFlight = true;
+            showLoading('Generating HTML Preview', 'Creating layout-preserving document...');
+            
+            processDocument()
             .then(data => {
                 hideLoading();
                 if (data.success) {
                     document.getElementById('mainContent').style.display = 'none';
                     document.getElementById('previewSection').style.display = 'block';
                     
-                    // Create a new window with the HTML content
-                    const newWindow = window.open('', '_blank');
-                    newWindow.document.write(data.processed_html);
-                    newWindow.document.close();
+                    // Open the processed document in a new window
+                    window.open(data.url, '_blank');
                     
                     showStatus('HTML preview opened in new window!', 'success');
                 } else {
@@ -2592,34 +3139,29 @@ Respond with a JSON object:
             .catch(error => {
                 hideLoading();
                 showStatus('Error generating preview: ' + error, 'error');
+            })
+            .finally(() => {
+                processRequestInFlight = false;
             });
         }
         
         function downloadDocument() {
+            if (processRequestInFlight) return;
+            processRequestInFlight = true;
             // First process the document, then download the HTML
             showLoading('Preparing Download', 'Generating final HTML document...');
             
-            fetch('/process', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ actions: userActions })
-            })
-            .then(response => response.json())
+            processDocument()
             .then(data => {
                 hideLoading();
                 if (data.success) {
-                    // Create a blob with the HTML content and download it
-                    const blob = new Blob([data.processed_html], { type: 'text/html' });
-                    const url = window.URL.createObjectURL(blob);
+                    // Download the processed document from its blob URL
                     const a = document.createElement('a');
-                    a.href = url;
+                    a.href = data.url;
                     a.download = 'translated_document.html';
                     document.body.appendChild(a);
                     a.click();
                     document.body.removeChild(a);
-                    window.URL.revokeObjectURL(url);
                     
                     showStatus('HTML document downloaded successfully!', 'success');
                 } else {
@@ -2633,6 +3175,9 @@ Respond with a JSON object:
             .catch(error => {
                 hideLoading();
                 showStatus('Error downloading document: ' + error, 'error');
+            })
+            .finally(() => {
+                processRequestInFlight = false;
             });
         }
         
@@ -2646,38 +3191,213 @@ Respond with a JSON object:
                 statusDiv.style.display = 'none';
             }, 3000);
         }
-    </script>
+"""
+
+_DYNAMIC_UI_JS_URL = register_ui_asset('dynamic_ui', 'js', _DYNAMIC_UI_JS, 'text/javascript')
+
+# The UI is a build-time constant, so it is parsed and allocated once at import
+# time rather than on every request.
+_DYNAMIC_UI_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Dynamic Document Translator</title>
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link rel="preload" as="style" href="https://fonts.googleapis.com/css2?family=Noto+Sans+Telugu&display=swap">
+    <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Noto+Sans+Telugu&display=swap" media="print" onload="this.media='all'">
+    <link rel="stylesheet" href="__DYNAMIC_UI_CSS_URL__">
+    <script defer src="__DYNAMIC_UI_JS_URL__"></script>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Dynamic Document Translator</h1>
+            <p>Upload any document image and control every text region</p>
+        </div>
+        
+        <div class="upload-section" id="uploadSection">
+            <div class="upload-icon">📄</div>
+            <div class="upload-text">Drag & drop your document image here or click to browse</div>
+            <input type="file" id="fileInput" class="file-input" accept="image/*">
+            <button class="upload-btn" onclick="document.getElementById('fileInput').click()">Choose File</button>
+        </div>
+        
+        <div class="model-selection-section">
+            <div class="section-title">🤖 Choose Translation Model</div>
+            <div class="model-grid" id="modelGrid">
+                <div class="model-loading-card">
+                    <div class="loading-spinner"></div>
+                    <div class="loading-text">Loading available models...</div>
+                </div>
+            </div>
+            <div class="translation-options">
+                <div class="section-title">🌐 Translation Options</div>
+                <div class="language-grid">
+                    <div class="language-card" data-lang="te">
+                        <div class="language-icon">📜</div>
+                        <div class="language-name">Telugu</div>
+                        <div class="language-desc">తెలుగు</div>
+                    </div>
+                    <div class="language-card" data-lang="hi">
+                        <div class="language-icon">📖</div>
+                        <div class="language-name">Hindi</div>
+                        <div class="language-desc">हिन्दी</div>
+                    </div>
+                    <div class="language-card" data-lang="ta">
+                        <div class="language-icon">📚</div>
+                        <div class="language-name">Tamil</div>
+                        <div class="language-desc">தமிழ்</div>
+                    </div>
+                    <div class="language-card" data-lang="kn">
+                        <div class="language-icon">📝</div>
+                        <div class="language-name">Kannada</div>
+                        <div class="language-desc">ಕನ್ನಡ</div>
+                    </div>
+                    <div class="language-card" data-lang="ml">
+                        <div class="language-icon">📄</div>
+                        <div class="language-name">Malayalam</div>
+                        <div class="language-desc">മലയാളം</div>
+                    </div>
+                    <div class="language-card" data-lang="en">
+                        <div class="language-icon">📰</div>
+                        <div class="language-name">English</div>
+                        <div class="language-desc">Improved</div>
+                    </div>
+                </div>
+            </div>
+            <div class="agent-mode-toggle">
+                <label class="toggle-label">
+                    <input type="checkbox" id="agentModeToggle" checked>
+                    <span class="toggle-slider"></span>
+                    <span class="toggle-text">🚀 Agentic Framework (Multi-Agent Pipeline)</span>
+                </label>
+            </div>
+        </div>
+        
+        <!-- Loading Overlay -->
+        <div class="loading-overlay" id="loadingOverlay">
+            <div class="loading-content">
+                <div class="loading-spinner"></div>
+                <div class="loading-text" id="loadingText">Processing...</div>
+                <div class="loading-subtext" id="loadingSubtext">Please wait</div>
+            </div>
+        </div>
+        
+        <div class="processing-section" id="processingSection">
+            <div class="section-title">Processing Document</div>
+            <div class="processing-step" id="step1">
+                <div class="step-icon">1</div>
+                <div class="step-text">Extracting text with OCR...</div>
+            </div>
+            <div class="processing-step" id="step2">
+                <div class="step-icon">2</div>
+                <div class="step-text">Translating text...</div>
+            </div>
+            <div class="processing-step" id="step3">
+                <div class="step-icon">3</div>
+                <div class="step-text">Preparing layout controls...</div>
+            </div>
+        </div>
+        
+        <div class="main-content" id="mainContent">
+            <div class="image-section">
+                <div class="section-title">Document Preview</div>
+                <div class="image-container" id="imageContainer">
+                    <img id="documentImage" class="document-image" alt="Document Preview">
+                </div>
+            </div>
+            
+            <div class="controls-section">
+                <div class="section-title">Text Region Controls</div>
+                <div class="status-message" id="statusMessage"></div>
+                <div id="textRegions"></div>
+                <div class="action-buttons">
+                    <button class="action-btn" id="previewBtn" onclick="previewDocument()">Preview Document</button>
+                    <button class="action-btn" id="downloadBtn" onclick="downloadDocument()">Download Result</button>
+                </div>
+            </div>
+        </div>
+        
+        <div class="preview-section" id="previewSection">
+            <div class="section-title">Final Document Preview</div>
+            <img id="previewImage" class="preview-image" alt="Final Document Preview">
+            <button class="download-btn" onclick="downloadDocument()">📥 Download HTML Document</button>
+        </div>
+    </div>
 </body>
 </html>
-"""
-    
-    return html_content
+""".replace('__DYNAMIC_UI_CSS_URL__', _DYNAMIC_UI_CSS_URL).replace('__DYNAMIC_UI_JS_URL__', _DYNAMIC_UI_JS_URL)
+
+def create_dynamic_ui():
+    """Create the dynamic UI with real backend integration"""
+    return _DYNAMIC_UI_HTML
+
+# Encoded and pre-compressed copies of the UI, so the encoders run once at
+# startup instead of on every request
+_DYNAMIC_UI_BYTES = _DYNAMIC_UI_HTML.encode('utf-8')
+_DYNAMIC_UI_GZ = gzip.compress(_DYNAMIC_UI_BYTES, compresslevel=9)
+_DYNAMIC_UI_BR = brotli.compress(_DYNAMIC_UI_BYTES, quality=11) if BROTLI_AVAILABLE else None
+_DYNAMIC_UI_ETAG = hashlib.sha256(_DYNAMIC_UI_BYTES).hexdigest()
+
+def inline_ui_assets(html):
+    """Inline the registered CSS and JS, for a copy of the page opened from disk"""
+    css = UI_ASSETS[_DYNAMIC_UI_CSS_URL.rsplit('/', 1)[1]][0].decode('utf-8')
+    js = UI_ASSETS[_DYNAMIC_UI_JS_URL.rsplit('/', 1)[1]][0].decode('utf-8')
+    html = html.replace(f'<link rel="stylesheet" href="{_DYNAMIC_UI_CSS_URL}">', f'<style>{css}</style>')
+    html = html.replace(f'    <script defer src="{_DYNAMIC_UI_JS_URL}"></script>\n', '')
+    # An inline script cannot be deferred, so it goes after the elements it looks up
+    head, body_end, tail = html.rpartition('</body>')
+    return f'{head}<script>{js}</script>\n{body_end}{tail}'
+
+# Self-contained copy of the UI written to disk by main()
+_DYNAMIC_UI_FILE_BYTES = inline_ui_assets(_DYNAMIC_UI_HTML).encode('utf-8')
+_DYNAMIC_UI_FILE_DIGEST = hashlib.sha256(_DYNAMIC_UI_FILE_BYTES).hexdigest()
+
+def open_browser():
+    """Open the UI in the default browser"""
+    try:
+        webbrowser.open('http://localhost:5000')
+        print("✅ Browser opened")
+    except Exception as e:
+        print(f"❌ Could not open browser: {e}")
 
 def main():
     print("Starting Dynamic Document Translator...")
     
-    # Create the HTML file
-    html_content = create_dynamic_ui()
-    html_path = 'DYNAMIC_DOCUMENT_TRANSLATOR.html'
+    # Create the HTML file, unless an identical copy is already on disk. The
+    # self-contained page and its SHA-256 were computed once at import time.
+    html_path = Path('DYNAMIC_DOCUMENT_TRANSLATOR.html')
     
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    existing_digest = None
+    if html_path.exists():
+        existing_digest = hashlib.sha256(html_path.read_bytes()).hexdigest()
     
-    print(f"✅ Dynamic UI saved as: {html_path}")
+    if existing_digest == _DYNAMIC_UI_FILE_DIGEST:
+        print(f"✅ Dynamic UI already up to date: {html_path}")
+    else:
+        # One write of the already-encoded page
+        html_path.write_bytes(_DYNAMIC_UI_FILE_BYTES)
+        print(f"✅ Dynamic UI saved as: {html_path}")
     
     # Start Flask server
     print("🚀 Starting Flask server...")
     print("📱 Open your browser and go to: http://localhost:5000")
     
-    # Open in browser
-    try:
-        webbrowser.open('http://localhost:5000')
-        print("✅ Browser opened")
-    except Exception as e:
-        print(f"❌ Could not open browser: {e}")
+    # Open in browser once the server is listening; launching a browser can
+    # block for seconds, so it happens on a timer thread
+    threading.Timer(1.0, open_browser).start()
     
-    # Start Flask app
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Start the server; the Flask debug server only runs when FLASK_DEBUG is set.
+    # app.debug is what Flask itself derived from FLASK_DEBUG.
+    debug = app.debug
+    if WAITRESS_AVAILABLE and not debug:
+        serve(app, host='0.0.0.0', port=5000, threads=8)
+    else:
+        if not debug:
+            print("⚠️ waitress not installed, using the Flask development server (pip install waitress)")
+        app.run(host='0.0.0.0', port=5000, debug=debug, threaded=True)
 
 if __name__ == "__main__":
     main()